@@ -1,71 +1,150 @@
-import os, asyncio, re, time, json, base64
-from dataclasses import dataclass, field
-from typing import Dict, Optional, List
-from dotenv import load_dotenv
+import sys, asyncio, re, time, json, base64, random, socket, signal, importlib.util, logging, queue, atexit, html
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, Optional, List, Set, Tuple
+import config
 
 import httpx
 import websockets
-import base58
+from nacl.signing import SigningKey
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters, CallbackQueryHandler
+from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters, CallbackQueryHandler, AIORateLimiter
+from telegram.request import HTTPXRequest
+from telegram.error import BadRequest
+
+try:
+    import re2  # google-re2: linear-time DFA matching for channel message scans
+except ImportError:
+    re2 = None
+
+try:
+    import hyperscan  # Intel Hyperscan: SIMD DFA scanning for channel messages (x86 only)
+except ImportError:
+    hyperscan = None
+
+try:
+    import based58 as b58  # Rust base58 codec for key/pubkey conversions
+except ImportError:
+    import base58 as b58  # pure-Python fallback with the same bytes-in/bytes-out API
+
+try:
+    import orjson  # Rust JSON codec for API payloads and responses
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # libuv event loop; not available on Windows
+except ImportError:
+    uvloop = None
+
+# ================== LOGGING ==================
+# The event loop only enqueues records; formatting and the stdout write
+# happen on the listener's background thread
+log_queue = queue.SimpleQueue()
+logger = logging.getLogger("leviathan")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%H:%M:%S"))
+log_listener = QueueListener(log_queue, _log_stream)
+log_listener.start()
+atexit.register(log_listener.stop)
+# Library warnings (PTB handler errors, httpx) take the same queue instead of a blocking stderr write
+logging.getLogger().addHandler(QueueHandler(log_queue))
 
 # ================== CONFIG ==================
-print("🔍 Loading configuration...")
-
-# Load environment variables
-load_dotenv()
+logger.info("🔍 Loading configuration...")
 
 # Telegram Bot Configuration
-BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_CHANNELS = [ch.strip() for ch in os.getenv("TELEGRAM_CHANNELS").split(",")]
+BOT_TOKEN = config.get("TELEGRAM_BOT_TOKEN")
+TELEGRAM_CHANNELS = [ch.strip() for ch in config.get("TELEGRAM_CHANNELS").split(",")]
 
 # Solana RPC Configuration
-RPC_URL = os.getenv("RPC_URL")
+RPC_URL = config.get("RPC_URL")
 WSS_URL = RPC_URL.replace("https://", "wss://")  # Helius WebSocket
-WALLET_PRIVATE_KEY = os.getenv("WALLET_PRIVATE_KEY")
+# Signed swaps are broadcast to every endpoint here (e.g. a staked/Jito sender); first accepted signature wins
+SEND_RPC_URLS = [u.strip() for u in (config.get("SEND_RPC_URLS") or RPC_URL).split(",") if u.strip()]
+WALLET_PRIVATE_KEY = config.get("WALLET_PRIVATE_KEY")
 
 # Trading Configuration
-TRADE_AMOUNT_USD = float(os.getenv("TRADE_AMOUNT_USD", "10.0"))
-TRADE_PERCENTAGE = float(os.getenv("TRADE_PERCENTAGE", "5.0"))
-USE_PERCENTAGE_TRADING = os.getenv("USE_PERCENTAGE_TRADING", "True").lower() == "true"
-STOP_LOSS_PCT = float(os.getenv("STOP_LOSS_PCT", "-30.0"))
-TRAIL_FROM_PEAK_PCT = float(os.getenv("TRAIL_FROM_PEAK_PCT", "15.0"))
-TP_LADDER = os.getenv("TP_LADDER", "2x:30,5x:20,10x:10,15x:15,20x:15,rest:trail15")
+TRADE_AMOUNT_USD = float(config.get("TRADE_AMOUNT_USD", "10.0"))
+TRADE_PERCENTAGE = float(config.get("TRADE_PERCENTAGE", "5.0"))
+USE_PERCENTAGE_TRADING = config.get("USE_PERCENTAGE_TRADING", "True").lower() == "true"
+STOP_LOSS_PCT = float(config.get("STOP_LOSS_PCT", "-30.0"))
+TRAIL_FROM_PEAK_PCT = float(config.get("TRAIL_FROM_PEAK_PCT", "15.0"))
+TP_LADDER = config.get("TP_LADDER", "2x:30,5x:20,10x:10,15x:15,20x:15,rest:trail15")
 
 # Re-entry Configuration
-REENTRY_ENABLED = os.getenv("REENTRY_ENABLED", "False").lower() == "true"
-REENTRY_CONFIRM_PCT = float(os.getenv("REENTRY_CONFIRM_PCT", "7.0"))
-MAX_REENTRIES_PER_TOKEN = int(os.getenv("MAX_REENTRIES_PER_TOKEN", "1"))
+REENTRY_ENABLED = config.get("REENTRY_ENABLED", "False").lower() == "true"
+REENTRY_CONFIRM_PCT = float(config.get("REENTRY_CONFIRM_PCT", "7.0"))
+MAX_REENTRIES_PER_TOKEN = int(config.get("MAX_REENTRIES_PER_TOKEN", "1"))
 
 # System Configuration
-DRY_RUN = os.getenv("DRY_RUN", "True").lower() == "true"  # Default to DRY_RUN for safety
-PRICE_POLL_SECONDS = float(os.getenv("PRICE_POLL_SECONDS", "0.5"))
-PRIORITY_FEE_MICROLAMPORTS = int(os.getenv("PRIORITY_FEE_MICROLAMPORTS", "20000"))
-MIN_LIQ_SOL = float(os.getenv("MIN_LIQ_SOL", "10.0"))
+DRY_RUN = config.get("DRY_RUN", "True").lower() == "true"  # Default to DRY_RUN for safety
+PRICE_POLL_SECONDS = float(config.get("PRICE_POLL_SECONDS", "0.5"))
+PRIORITY_FEE_MICROLAMPORTS = int(config.get("PRIORITY_FEE_MICROLAMPORTS", "20000"))
+DYNAMIC_PRIORITY_FEE = config.get("DYNAMIC_PRIORITY_FEE", "True").lower() == "true"
+MAX_PRIORITY_FEE_MICROLAMPORTS = int(config.get("MAX_PRIORITY_FEE_MICROLAMPORTS", "1000000"))
+MIN_LIQ_SOL = float(config.get("MIN_LIQ_SOL", "10.0"))
+MAX_CONCURRENT_WATCHERS = int(config.get("MAX_CONCURRENT_WATCHERS", "20"))
+
+# User state tracking, kept per user in context.user_data[USER_STATE_KEY]
+class US(IntEnum):
+    NONE = 0
+    WAITING_KEY = 1
+
+USER_STATE_KEY = "state"
 
-# User state tracking
-user_states = {}  # Track user states for private key input
+# Channel list; an insertion-ordered dict so membership and removal are O(1)
+CHANNELS: Dict[str, None] = dict.fromkeys(TELEGRAM_CHANNELS)
 
-# Channel list
-CHANNELS = TELEGRAM_CHANNELS
+# Menus show the channel list on most taps; rebuilt only when CHANNELS changes
+_channels_joined = ", ".join(CHANNELS)
+_remove_channel_view = None  # (text, markup) for Abandon Waters, built on first use
+
+def _refresh_channels_cache():
+    global _channels_joined, _remove_channel_view
+    _channels_joined = ", ".join(CHANNELS)
+    _remove_channel_view = None
 
 # ================== CONSTS ==================
-SOL_MINT = os.getenv("SOL_MINT")
-MINT_RE = re.compile(r"\b[1-9A-HJ-NP-Za-km-z]{32,44}\b")
+SOL_MINT = config.get("SOL_MINT")
+MINT_PATTERN = r"\b[1-9A-HJ-NP-Za-km-z]{32,44}\b"
+MINT_RE = (re2 or re).compile(MINT_PATTERN)
+MINT_HS_DB = None
+if hyperscan:
+    MINT_HS_DB = hyperscan.Database()
+    MINT_HS_DB.compile(expressions=[MINT_PATTERN.encode()], flags=[hyperscan.HS_FLAG_SOM_LEFTMOST])
+
+BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+def is_mint_address(text: str) -> bool:
+    """32-44 base58 chars; translate() strips valid bytes in C, so any leftover means invalid"""
+    return 32 <= len(text) <= 44 and text.isascii() and not text.encode().translate(None, BASE58_ALPHABET)
+
+def find_mints(text: str) -> List[str]:
+    """All mint-shaped tokens in text, via Hyperscan when available"""
+    if MINT_HS_DB is None:
+        return MINT_RE.findall(text)
+    data = text.encode()
+    found = []
+    MINT_HS_DB.scan(data, match_event_handler=lambda _id, start, end, _flags, _ctx: found.append(data[start:end].decode()))
+    return found
 JUP_PRICE = "https://price.jup.ag/v6/price"        # token price in SOL
 JUP_QUOTE = "https://quote-api.jup.ag/v6/quote"    # for pre-wa কাজ rm & later swaps
 JUP_SWAP = "https://quote-api.jup.ag/v6/swap"      # for executing swaps
+JUP_PROGRAM_ID = "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QUuQE6YN8"  # fee market reference for priority estimates
 
 # Solana constants
-LAMPORTS_PER_SOL = int(os.getenv("LAMPORTS_PER_SOL", "1000000000"))
+LAMPORTS_PER_SOL = int(config.get("LAMPORTS_PER_SOL", "1000000000"))
 
 # Validate only critical environment variables
 if not BOT_TOKEN or not RPC_URL or not WALLET_PRIVATE_KEY or not CHANNELS or not SOL_MINT:
     raise SystemExit("Missing required configuration: BOT_TOKEN, RPC_URL, WALLET_PRIVATE_KEY, CHANNELS, SOL_MINT")
 
-def pct(a: float, b: float) -> float:
-    return (b / a - 1.0) * 100.0
-
 def parse_tp_ladder(text: str):
     # "2x:25,4x:25,10x:30,rest:trail15" -> list
     out = []
@@ -76,10 +155,32 @@ def parse_tp_ladder(text: str):
         out.append((k, v))
     return out
 
+def compile_tp_ladder(steps) -> Tuple[List[Tuple[float, float, str, int]], float]:
+    # [("2x","30"), ..., ("rest","trail15")] -> ([(2.0, 30.0, "2.0x", 0b1), ...], 15.0)
+    # parsed once so the price loop never touches strings; the last field is the step's ladder_done bit
+    ladder = []
+    rest_trail = TRAIL_FROM_PEAK_PCT  # default
+    for step, val in steps:
+        try:
+            if step == "rest":
+                if val.startswith("trail"):
+                    rest_trail = float(val.replace("trail", ""))
+                continue
+            mult = float(step.replace("x", ""))
+            ladder.append((mult, float(val), f"{mult}x"))
+        except ValueError:
+            continue
+    ladder.sort()
+    return [(mult, sell_pct, key, 1 << i) for i, (mult, sell_pct, key) in enumerate(ladder)], rest_trail
+
 TP_STEPS = parse_tp_ladder(TP_LADDER)
+PARSED_TP_STEPS, REST_TRAIL_PCT = compile_tp_ladder(TP_STEPS)
+# Percent thresholds folded into price multipliers so each tick is a plain float compare
+SL_PRICE_FACTOR = 1.0 + STOP_LOSS_PCT / 100.0
+TRAIL_PRICE_FACTOR = 1.0 - REST_TRAIL_PCT / 100.0
 
 # ================== STATE ==================
-@dataclass
+@dataclass(slots=True)
 class Position:
     mint: str
     entry_price: float           # in SOL per token
@@ -87,42 +188,245 @@ class Position:
     peak_price: float
     remaining_pct: float = 100.0
     last_exit_price: Optional[float] = None
-    ladder_done: Dict[str, bool] = field(default_factory=dict)
+    ladder_done: int = 0         # bitmask, bit i = PARSED_TP_STEPS[i] sold
     reentries_used: int = 0
     active: bool = True
+    stop_price: float = 0.0       # hard SL fires at or below this
+    trail_stop_price: float = 0.0 # trailing stop fires at or below this (moves with peak)
+    ladder_prices: Tuple[float, ...] = ()  # absolute trigger price per PARSED_TP_STEPS entry
+    next_ladder_price: float = 0.0         # lowest trigger not yet sold (inf when done)
+
+    def __post_init__(self):
+        self.stop_price = self.entry_price * SL_PRICE_FACTOR
+        self.trail_stop_price = self.peak_price * TRAIL_PRICE_FACTOR
+        self.ladder_prices = tuple(self.entry_price * step[0] for step in PARSED_TP_STEPS)
+        self.refresh_next_ladder_price()
+
+    def refresh_next_ladder_price(self):
+        self.next_ladder_price = next(
+            (trigger for trigger, step in zip(self.ladder_prices, PARSED_TP_STEPS) if not self.ladder_done & step[3]),
+            float("inf"),
+        )
 
 positions: Dict[str, Position] = {}  # mint -> Position
 
 # Initialize wallet (simplified for now)
 wallet_keypair = None
 
+# Derived once per wallet change instead of on every trade/balance call
+WALLET_PRIVKEY_BYTES: Optional[bytes] = None
+WALLET_PUBKEY_B58 = ""
+WALLET_SIGNING_KEY: Optional[SigningKey] = None
+
+def keypair_mismatch(private_key_bytes: bytes) -> bool:
+    """True if a 64-byte keypair's public half doesn't match the key derived from its seed"""
+    if len(private_key_bytes) < 64:
+        return False
+    return SigningKey(private_key_bytes[:32]).verify_key.encode() != private_key_bytes[32:64]
+
+def load_wallet(private_key_str: str, private_key_bytes: Optional[bytes] = None):
+    """Set the active wallet and derive its key bytes and base58 public key"""
+    global WALLET_PRIVATE_KEY, WALLET_PRIVKEY_BYTES, WALLET_PUBKEY_B58, WALLET_SIGNING_KEY
+    WALLET_PRIVATE_KEY = private_key_str
+    if private_key_bytes is None and private_key_str:
+        private_key_bytes = parse_private_key(private_key_str)
+    WALLET_PRIVKEY_BYTES = private_key_bytes
+    if WALLET_PRIVKEY_BYTES and len(WALLET_PRIVKEY_BYTES) >= 32:
+        # The first 32 bytes are the Ed25519 seed; the public key is derived from it
+        WALLET_SIGNING_KEY = SigningKey(WALLET_PRIVKEY_BYTES[:32])
+        verify_key = WALLET_SIGNING_KEY.verify_key
+        WALLET_PUBKEY_B58 = b58encode(verify_key.encode())
+        if keypair_mismatch(WALLET_PRIVKEY_BYTES):
+            logger.warning("⚠️ Wallet keypair public half does not match its seed, using the derived key")
+    else:
+        WALLET_SIGNING_KEY = None
+        WALLET_PUBKEY_B58 = ""
+    # A cached balance belongs to the previous wallet
+    _balance_cache["value"] = None
+
 async def init_solana():
     global wallet_keypair
     # For now, just store the private key as string
     # In production, you'd parse and use it properly
     wallet_keypair = WALLET_PRIVATE_KEY
-    print("✅ Wallet initialized (simplified mode)")
+    load_wallet(WALLET_PRIVATE_KEY)
+    logger.info("✅ Wallet initialized (simplified mode)")
 
 # ================== HELIUS WEBSOCKET (heartbeat) ==================
+WS_SYNC_SECONDS = 1.0  # how often to reconcile mint subscriptions when the socket is quiet
+WS_BACKOFF_MIN_SECONDS = 1.0
+WS_BACKOFF_MAX_SECONDS = 30.0
+
+class MintLogSubscriptions:
+    """logsSubscribe per watched mint on one Helius socket.
+
+    Every transaction touching a watched mint pushes a logsNotification; we
+    use it to wake the price pump right away instead of waiting for its next
+    poll. Subscriptions live per connection and are rebuilt on reconnect.
+    """
+    def __init__(self, ws):
+        self.ws = ws
+        self.next_id = 2  # id 1 is the slot subscription
+        self.pending: Dict[int, str] = {}     # request id -> mint
+        self.sub_ids: Dict[str, int] = {}     # mint -> subscription id
+        self.by_sub: Dict[int, str] = {}      # subscription id -> mint
+        self.requested: Set[str] = set()
+
+    async def sync(self):
+        for mint in watched_mints - self.requested:
+            self.requested.add(mint)
+            self.pending[self.next_id] = mint
+            await self.ws.send(json_dumps_text({
+                "jsonrpc": "2.0",
+                "id": self.next_id,
+                "method": "logsSubscribe",
+                "params": [{"mentions": [mint]}, {"commitment": "processed"}]
+            }))
+            self.next_id += 1
+        for mint in self.requested - watched_mints:
+            sub_id = self.sub_ids.pop(mint, None)
+            if sub_id is None:
+                continue  # still waiting for the subscribe reply
+            self.requested.discard(mint)
+            push_subscribed_mints.discard(mint)
+            self.by_sub.pop(sub_id, None)
+            await self.ws.send(json_dumps_text({
+                "jsonrpc": "2.0",
+                "id": self.next_id,
+                "method": "logsUnsubscribe",
+                "params": [sub_id]
+            }))
+            self.next_id += 1
+
+    def handle(self, msg: dict):
+        if msg.get("method") == "logsNotification":
+            mint = self.by_sub.get(msg["params"]["subscription"])
+            if mint:
+                push_dirty_mints.add(mint)
+                price_pump_wakeup.set()
+        elif msg.get("id") in self.pending:
+            mint = self.pending.pop(msg["id"])
+            if "result" in msg:
+                self.sub_ids[mint] = msg["result"]
+                self.by_sub[msg["result"]] = mint
+                push_subscribed_mints.add(mint)
+            else:
+                logger.warning("⚠️ logsSubscribe failed for %s: %s", mint, msg.get('error'))
+                self.requested.discard(mint)
+
+# Serialized once; resent as-is on every reconnect (text frame, like the other subscriptions)
+SLOT_SUB_TEXT = '{"jsonrpc":"2.0","id":1,"method":"slotSubscribe","params":[]}'
+
 async def helius_heartbeat():
     # Keep a slot subscription to stay synced (helps sub-500ms reactivity)
+    # and push-subscribe to logs of every watched mint
     if not WSS_URL.startswith("wss://"):
         return
-    sub_req = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "slotSubscribe",
-        "params": []
-    }
+    backoff = WS_BACKOFF_MIN_SECONDS
     while True:
         try:
-            async with websockets.connect(WSS_URL, ping_interval=20, ping_timeout=20) as ws:
-                await ws.send(json.dumps(sub_req))
-                # Just read and discard; existence of the stream keeps TCP warm
-                async for _ in ws:
-                    pass
+            # Frames are small JSON notifications; permessage-deflate only costs CPU per frame
+            async with websockets.connect(WSS_URL, open_timeout=5, close_timeout=1,
+                                          ping_interval=25, ping_timeout=20, compression=None) as ws:
+                enable_tcp_keepalive(ws.transport.get_extra_info("socket"))
+                await ws.send(SLOT_SUB_TEXT)
+                backoff = WS_BACKOFF_MIN_SECONDS
+                subs = MintLogSubscriptions(ws)
+                while True:
+                    await subs.sync()
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=WS_SYNC_SECONDS)
+                    except asyncio.TimeoutError:
+                        continue
+                    subs.handle(json_loads(raw))
         except Exception:
-            await asyncio.sleep(1.0)  # reconnect
+            # Subscriptions die with the socket; the pump polls everything until they're rebuilt
+            push_subscribed_mints.clear()
+            # Reconnect with jittered exponential backoff so an outage doesn't become a tight loop
+            await asyncio.sleep(backoff + random.random())
+            backoff = min(backoff * 2, WS_BACKOFF_MAX_SECONDS)
+
+def enable_tcp_keepalive(sock):
+    """Detect half-open sockets at the TCP level (idle/interval options are Linux-only)"""
+    if sock is None:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+
+# ================== HTTP ==================
+# Shared client so every request reuses pooled keep-alive connections
+# instead of paying a fresh TCP + TLS handshake per call
+http_client: Optional[httpx.AsyncClient] = None
+
+# HTTP/2 multiplexes concurrent polls/quotes to the same host over one TLS session (needs h2)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+_http_version_logged: Set[str] = set()
+
+async def _log_http_version(response: httpx.Response):
+    # Confirm protocol negotiation once per host
+    host = response.url.host
+    if host not in _http_version_logged:
+        _http_version_logged.add(host)
+        logger.info("🌐 %s: %s", host, response.http_version)
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=5.0),
+        # 60s expiry outlives SOL_PRICE_TTL_SECONDS so CoinGecko stays warm too
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0),
+        event_hooks={"response": [_log_http_version]}
+    )
+
+async def close_http_client():
+    """Close the shared client once at shutdown; safe if it was never opened"""
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+# Caps in-flight requests across all helpers so a burst of signals can't
+# fan out into enough parallel calls to trip provider rate limits
+HTTP_MAX_IN_FLIGHT = 8
+http_semaphore = asyncio.Semaphore(HTTP_MAX_IN_FLIGHT)
+
+def json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(obj) -> bytes:
+    return orjson.dumps(obj) if orjson else json.dumps(obj, separators=(",", ":")).encode()
+
+def json_dumps_text(obj) -> str:
+    # Websocket JSON-RPC goes out as text frames; bytes would be sent as binary frames
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj, separators=(",", ":"))
+
+class OrjsonHTTPXRequest(HTTPXRequest):
+    """PTB request that decodes Bot API responses (getUpdates batches included) with orjson"""
+    @staticmethod
+    def parse_json_payload(payload: bytes) -> dict:
+        if orjson:
+            try:
+                return orjson.loads(payload)
+            except orjson.JSONDecodeError:
+                pass  # PTB's decoder replaces invalid UTF-8 and raises a TelegramError
+        return HTTPXRequest.parse_json_payload(payload)
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+async def http_get(url: str, **kwargs) -> httpx.Response:
+    async with http_semaphore:
+        return await http_client.get(url, **kwargs)
+
+async def http_post(url: str, json=None, **kwargs) -> httpx.Response:
+    if json is not None:
+        # Encode ourselves instead of letting httpx run the stdlib encoder
+        kwargs["content"] = json_dumps(json)
+        kwargs["headers"] = {**JSON_HEADERS, **kwargs.get("headers", {})}
+    async with http_semaphore:
+        return await http_client.post(url, **kwargs)
 
 # ================== PRICE FEED ==================
 # Rate limiter for API calls
@@ -141,7 +445,7 @@ class RateLimiter:
         if len(self.requests) >= self.max_requests:
             sleep_time = self.time_window - (now - self.requests[0])
             if sleep_time > 0:
-                print(f"⏳ Rate limit reached, waiting {sleep_time:.1f}s...")
+                logger.warning("⏳ Rate limit reached, waiting %.1fs...", sleep_time)
                 await asyncio.sleep(sleep_time)
         
         self.requests.append(now)
@@ -162,64 +466,211 @@ async def get_price_vs_sol(mint: str) -> Optional[float]:
             if attempt > 0:
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
             
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.get(JUP_PRICE, params={"ids": mint, "vsToken": SOL_MINT})
-                
-                if r.status_code == 200:
-                    data = r.json().get("data", {}).get(mint)
-                    if data and "price" in data:
-                        price = float(data["price"])
-                        print(f"✅ Price fetched: {mint} = {price:.10f} SOL (attempt {attempt + 1})")
-                        return price
-                    else:
-                        print(f"⚠️ No price data for {mint} (attempt {attempt + 1})")
-                elif r.status_code == 429:
-                    print(f"⚠️ Rate limited, retrying in {2 ** attempt}s...")
-                    continue
+            r = await http_get(JUP_PRICE, params={"ids": mint, "vsToken": SOL_MINT}, timeout=5.0)
+            
+            if r.status_code == 200:
+                data = json_loads(r.content).get("data", {}).get(mint)
+                if data and "price" in data:
+                    price = float(data["price"])
+                    logger.info("✅ Price fetched: %s = %.10f SOL (attempt %s)", mint, price, attempt + 1)
+                    return price
                 else:
-                    print(f"⚠️ HTTP {r.status_code} for {mint} (attempt {attempt + 1})")
+                    logger.warning("⚠️ No price data for %s (attempt %s)", mint, attempt + 1)
+            elif r.status_code == 429:
+                logger.warning("⚠️ Rate limited, retrying in %ss...", 2 ** attempt)
+                continue
+            else:
+                logger.warning("⚠️ HTTP %s for %s (attempt %s)", r.status_code, mint, attempt + 1)
                     
         except asyncio.TimeoutError:
-            print(f"⏰ Timeout fetching price for {mint} (attempt {attempt + 1})")
+            logger.warning("⏰ Timeout fetching price for %s (attempt %s)", mint, attempt + 1)
         except Exception as e:
-            print(f"❌ Error fetching price for {mint}: {e} (attempt {attempt + 1})")
+            logger.error("❌ Error fetching price for %s: %s (attempt %s)", mint, e, attempt + 1)
     
-    print(f"❌ Failed to fetch price for {mint} after {max_retries} attempts")
+    logger.error("❌ Failed to fetch price for %s after %s attempts", mint, max_retries)
     
     # Try fallback price source (CoinGecko)
     try:
-        print(f"🔄 Trying fallback price source for {mint}...")
+        logger.info("🔄 Trying fallback price source for %s...", mint)
         await rate_limiter.wait_if_needed()
         
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            # Try to get token info from CoinGecko
-            response = await client.get(f"https://api.coingecko.com/api/v3/coins/solana/contract/{mint}")
-            if response.status_code == 200:
-                data = response.json()
-                if "market_data" in data and "current_price" in data["market_data"]:
-                    sol_price = await get_sol_price_usd()
-                    if sol_price:
-                        token_price_usd = data["market_data"]["current_price"]["usd"]
-                        token_price_sol = token_price_usd / sol_price
-                        print(f"✅ Fallback price fetched: {mint} = {token_price_sol:.10f} SOL")
-                        return token_price_sol
+        # Try to get token info from CoinGecko
+        response = await http_get(f"https://api.coingecko.com/api/v3/coins/solana/contract/{mint}", timeout=5.0)
+        if response.status_code == 200:
+            data = json_loads(response.content)
+            if "market_data" in data and "current_price" in data["market_data"]:
+                sol_price = await get_sol_price_usd_cached()
+                if sol_price:
+                    token_price_usd = data["market_data"]["current_price"]["usd"]
+                    token_price_sol = token_price_usd / sol_price
+                    logger.info("✅ Fallback price fetched: %s = %.10f SOL", mint, token_price_sol)
+                    return token_price_sol
     except Exception as e:
-        print(f"❌ Fallback price source also failed: {e}")
+        logger.error("❌ Fallback price source also failed: %s", e)
     
     return None
 
+# Per-mint price cache shared by all watchers and the buy path; concurrent
+# misses on the same mint await one in-flight fetch (single-flight) instead
+# of each issuing their own
+PRICE_CACHE_TTL_SECONDS = 0.35
+_price_cache: Dict[str, Tuple[float, float]] = {}  # mint -> (price, monotonic ts)
+_price_inflight: Dict[str, asyncio.Future] = {}   # mint -> pending fetch, removed when done
+
+async def _fetch_price_into_cache(mint: str) -> Optional[float]:
+    price = await get_price_vs_sol(mint)
+    if price is not None:
+        _price_cache[mint] = (price, time.monotonic())
+    return price
+
+async def get_price_cached(mint: str, max_age: float = PRICE_CACHE_TTL_SECONDS) -> Optional[float]:
+    """Get token price vs SOL, reusing a fetch younger than max_age seconds"""
+    cached = _price_cache.get(mint)
+    if cached and time.monotonic() - cached[1] < max_age:
+        return cached[0]
+    
+    fut = _price_inflight.get(mint)
+    if fut is None:
+        fut = asyncio.ensure_future(_fetch_price_into_cache(mint))
+        _price_inflight[mint] = fut
+        fut.add_done_callback(lambda _: _price_inflight.pop(mint, None))
+    # Shielded so one cancelled caller doesn't cancel the fetch for the others
+    return await asyncio.shield(fut)
+
+# Mints with a running watcher; the price pump refreshes all of them with a
+# single Jupiter request per tick instead of one request per position
+watched_mints = set()
+# Set (and immediately cleared) by the pump whenever a watched mint's price
+# changes, so watchers sleep until there is something new to evaluate
+_price_events: Dict[str, asyncio.Event] = {}
+PRICE_EVENT_TIMEOUT = 2.0  # wake at least this often to catch a stalled pump
+# Watchers per mint: a position waiting on re-entry can overlap a fresh buy of
+# the same mint, so the registries above are only cleared by the last one out
+_watcher_counts: Dict[str, int] = {}
+
+def watch_mint(mint: str):
+    _watcher_counts[mint] = _watcher_counts.get(mint, 0) + 1
+    watched_mints.add(mint)
+    _price_events.setdefault(mint, asyncio.Event())
+
+def unwatch_mint(mint: str):
+    remaining = _watcher_counts.get(mint, 1) - 1
+    if remaining > 0:
+        _watcher_counts[mint] = remaining
+        return
+    _watcher_counts.pop(mint, None)
+    watched_mints.discard(mint)
+    _price_events.pop(mint, None)
+    _price_cache.pop(mint, None)
+# Mints with a live logsSubscribe are only re-priced after a push (an on-chain
+# trade) or, as a fallback, once no push has arrived for PUSH_FALLBACK_SECONDS
+PUSH_FALLBACK_SECONDS = 2.0
+push_subscribed_mints: Set[str] = set()
+push_dirty_mints: Set[str] = set()   # pushed since the pump's last fetch
+# Set by the Helius log subscription when a watched mint trades
+price_pump_wakeup = asyncio.Event()
+PRICE_PUMP_MIN_INTERVAL = 0.1  # floor between pushed refreshes
+JUP_PRICE_MAX_IDS = 100  # Jupiter accepts up to 100 comma-separated ids
+
+async def _get_price_batch(batch: List[str]) -> Dict[str, float]:
+    # Not metered by rate_limiter: the pump paces itself (PRICE_POLL_SECONDS /
+    # PRICE_PUMP_MIN_INTERVAL), and the shared 8/min budget would both stall it
+    # for most of a minute and starve buy/sell quotes
+    r = await http_get(JUP_PRICE, params={"ids": ",".join(batch), "vsToken": SOL_MINT}, timeout=5.0)
+    if r.status_code != 200:
+        logger.warning("⚠️ Batch price HTTP %s for %s mint(s)", r.status_code, len(batch))
+        return {}
+    data = json_loads(r.content).get("data", {})
+    prices = {}
+    for mint in batch:
+        entry = data.get(mint)
+        if entry and "price" in entry:
+            prices[mint] = float(entry["price"])
+    return prices
+
+async def get_prices_vs_sol(mints: List[str]) -> Dict[str, float]:
+    """Get prices vs SOL for many mints in as few Jupiter requests as possible"""
+    batches = [mints[i:i + JUP_PRICE_MAX_IDS] for i in range(0, len(mints), JUP_PRICE_MAX_IDS)]
+    # One failed batch shouldn't drop prices from the others
+    results = await asyncio.gather(*(_get_price_batch(b) for b in batches), return_exceptions=True)
+    prices = {}
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("❌ Batch price error: %s", result)
+        else:
+            prices.update(result)
+    return prices
+
+async def wait_for_price_update(mint: str):
+    """Sleep until the pump publishes a new price for mint (or the timeout passes)"""
+    evt = _price_events.get(mint)
+    if evt is None:
+        await asyncio.sleep(PRICE_POLL_SECONDS)
+        return
+    try:
+        await asyncio.wait_for(evt.wait(), timeout=PRICE_EVENT_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+
+async def price_pump():
+    # Keep _price_cache warm for every watched mint; refresh early when
+    # the Helius log subscription reports on-chain activity
+    while True:
+        price_pump_wakeup.clear()
+        now = time.monotonic()
+        mints = [
+            m for m in watched_mints
+            if m not in push_subscribed_mints or m in push_dirty_mints
+            or now - _price_cache.get(m, (0.0, 0.0))[1] >= PUSH_FALLBACK_SECONDS
+        ]
+        push_dirty_mints.clear()
+        if mints:
+            try:
+                prices = await get_prices_vs_sol(mints)
+                now = time.monotonic()
+                for mint, price in prices.items():
+                    previous = _price_cache.get(mint)
+                    _price_cache[mint] = (price, now)
+                    evt = _price_events.get(mint)
+                    if evt and (previous is None or previous[0] != price):
+                        evt.set()
+                        evt.clear()
+            except Exception as e:
+                logger.error("❌ Price pump error: %s", e)
+        await asyncio.sleep(PRICE_PUMP_MIN_INTERVAL)
+        try:
+            await asyncio.wait_for(price_pump_wakeup.wait(), timeout=max(0.0, PRICE_POLL_SECONDS - PRICE_PUMP_MIN_INTERVAL))
+        except asyncio.TimeoutError:
+            pass
+
 # Optional: pre-warm route for lower latency on buy
-async def prewarm_quote(mint: str):
+# A buy quote issued speculatively while the price is still being fetched
+# is handed straight to jupiter_buy if it is still this fresh
+PREWARM_QUOTE_MAX_AGE_SECONDS = 2.0
+
+FALLBACK_SOL_PRICE_USD = 100.0  # only used if CoinGecko has never answered
+
+async def _usd_to_lamports(usd_amount: float) -> int:
+    # Same cached SOL/USD price the balance conversion uses, so sizing costs no extra request
+    sol_price_usd = await get_sol_price_usd_cached() or FALLBACK_SOL_PRICE_USD
+    return int(usd_amount / sol_price_usd * LAMPORTS_PER_SOL)
+
+async def prewarm_quote(mint: str, usd_amount) -> Optional[dict]:
+    """Fetch the real-size buy quote; usd_amount may be a pending future"""
     try:
+        amount_lamports = await _usd_to_lamports(await usd_amount if asyncio.isfuture(usd_amount) else usd_amount)
         params = {
             "inputMint": SOL_MINT, "outputMint": mint,
-            "amount": 5000000,  # 0.005 SOL
-            "slippageBps": 300, "onlyDirectRoutes": False
+            "amount": str(amount_lamports),
+            "slippageBps": 300, "onlyDirectRoutes": False,
+            "asLegacyTransaction": False
         }
-        async with httpx.AsyncClient(timeout=1.2) as client:
-            await client.get(JUP_QUOTE, params=params)
+        r = await http_get(JUP_QUOTE, params=params, timeout=1.2)
+        if r.status_code != 200:
+            return None
+        return json_loads(r.content)
     except Exception:
-        pass
+        return None
 
 # ================== JUPITER API FUNCTIONS ==================
 async def get_jupiter_quote(input_mint: str, output_mint: str, amount: int, slippage_bps: int = 300) -> Optional[dict]:
@@ -244,24 +695,23 @@ async def get_jupiter_quote(input_mint: str, output_mint: str, amount: int, slip
                 "asLegacyTransaction": False
             }
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(JUP_QUOTE, params=params)
-                
-                if response.status_code == 200:
-                    print(f"✅ Jupiter quote successful (attempt {attempt + 1})")
-                    return response.json()
-                elif response.status_code == 429:
-                    print(f"⚠️ Jupiter rate limited, retrying in {1 + attempt}s...")
-                    continue
-                else:
-                    print(f"⚠️ Jupiter HTTP {response.status_code} (attempt {attempt + 1})")
+            response = await http_get(JUP_QUOTE, params=params, timeout=10.0)
+            
+            if response.status_code == 200:
+                logger.info("✅ Jupiter quote successful (attempt %s)", attempt + 1)
+                return json_loads(response.content)
+            elif response.status_code == 429:
+                logger.warning("⚠️ Jupiter rate limited, retrying in %ss...", 1 + attempt)
+                continue
+            else:
+                logger.warning("⚠️ Jupiter HTTP %s (attempt %s)", response.status_code, attempt + 1)
                     
         except asyncio.TimeoutError:
-            print(f"⏰ Jupiter quote timeout (attempt {attempt + 1})")
+            logger.warning("⏰ Jupiter quote timeout (attempt %s)", attempt + 1)
         except Exception as e:
-            print(f"❌ Jupiter quote error: {e} (attempt {attempt + 1})")
+            logger.error("❌ Jupiter quote error: %s (attempt %s)", e, attempt + 1)
     
-    print(f"❌ Failed to get Jupiter quote after {max_retries} attempts")
+    logger.error("❌ Failed to get Jupiter quote after %s attempts", max_retries)
     return None
 
 async def get_jupiter_swap_transaction(quote: dict, user_public_key: str) -> Optional[dict]:
@@ -284,27 +734,26 @@ async def get_jupiter_swap_transaction(quote: dict, user_public_key: str) -> Opt
                 "useSharedAccounts": True,
                 "feeAccount": None,
                 "trackingAccount": None,
-                "computeUnitPriceMicroLamports": PRIORITY_FEE_MICROLAMPORTS
+                "computeUnitPriceMicroLamports": await get_priority_fee_cached()
             }
             
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(JUP_SWAP, json=payload)
-                
-                if response.status_code == 200:
-                    print(f"✅ Jupiter swap transaction successful (attempt {attempt + 1})")
-                    return response.json()
-                elif response.status_code == 429:
-                    print(f"⚠️ Jupiter swap rate limited, retrying in {1 + attempt}s...")
-                    continue
-                else:
-                    print(f"⚠️ Jupiter swap HTTP {response.status_code} (attempt {attempt + 1})")
+            response = await http_post(JUP_SWAP, json=payload, timeout=15.0)
+            
+            if response.status_code == 200:
+                logger.info("✅ Jupiter swap transaction successful (attempt %s)", attempt + 1)
+                return json_loads(response.content)
+            elif response.status_code == 429:
+                logger.warning("⚠️ Jupiter swap rate limited, retrying in %ss...", 1 + attempt)
+                continue
+            else:
+                logger.warning("⚠️ Jupiter swap HTTP %s (attempt %s)", response.status_code, attempt + 1)
                     
         except asyncio.TimeoutError:
-            print(f"⏰ Jupiter swap timeout (attempt {attempt + 1})")
+            logger.warning("⏰ Jupiter swap timeout (attempt %s)", attempt + 1)
         except Exception as e:
-            print(f"❌ Jupiter swap error: {e} (attempt {attempt + 1})")
+            logger.error("❌ Jupiter swap error: %s (attempt %s)", e, attempt + 1)
     
-    print(f"❌ Failed to get Jupiter swap transaction after {max_retries} attempts")
+    logger.error("❌ Failed to get Jupiter swap transaction after %s attempts", max_retries)
     return None
 
 async def get_token_balance(mint: str, owner: str) -> float:
@@ -313,6 +762,41 @@ async def get_token_balance(mint: str, owner: str) -> float:
     # In production, you'd implement proper balance checking
     return 100.0  # Mock balance
 
+# Short-lived caches so back-to-back /buy commands don't re-query RPC/CoinGecko
+SOL_PRICE_TTL_SECONDS = 30.0
+BALANCE_TTL_SECONDS = 15.0
+PRIORITY_FEE_TTL_SECONDS = 10.0
+_sol_usd_cache = {"value": None, "ts": 0.0}
+_balance_cache = {"value": None, "ts": 0.0}
+_priority_fee_cache = {"value": None, "ts": 0.0}
+
+async def get_priority_fee_cached() -> int:
+    """Priority fee (microlamports/CU): Helius estimate, never below the configured floor"""
+    if not DYNAMIC_PRIORITY_FEE:
+        return PRIORITY_FEE_MICROLAMPORTS
+    if _priority_fee_cache["value"] is not None and time.monotonic() - _priority_fee_cache["ts"] < PRIORITY_FEE_TTL_SECONDS:
+        return _priority_fee_cache["value"]
+    
+    fee = PRIORITY_FEE_MICROLAMPORTS
+    try:
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getPriorityFeeEstimate",
+            "params": [{"accountKeys": [JUP_PROGRAM_ID], "options": {"priorityLevel": "High"}}]
+        }
+        response = await http_post(RPC_URL, json=payload, timeout=2.0)
+        if response.status_code == 200:
+            estimate = json_loads(response.content).get("result", {}).get("priorityFeeEstimate")
+            if estimate:
+                fee = min(max(fee, int(estimate)), MAX_PRIORITY_FEE_MICROLAMPORTS)
+    except Exception as e:
+        logger.warning("⚠️ Priority fee estimate error: %s", e)
+    
+    _priority_fee_cache["value"] = fee
+    _priority_fee_cache["ts"] = time.monotonic()
+    return fee
+
 async def get_wallet_balance_usd() -> float:
     """Get wallet balance in USD"""
     try:
@@ -322,41 +806,57 @@ async def get_wallet_balance_usd() -> float:
             sol_price_usd = 100.0
             return mock_sol_balance * sol_price_usd
         
+        if _balance_cache["value"] is not None and time.monotonic() - _balance_cache["ts"] < BALANCE_TTL_SECONDS:
+            return _balance_cache["value"]
+        
         # Get SOL balance from wallet
-        wallet_pubkey = base58.b58encode(base58.b58decode(WALLET_PRIVATE_KEY)[:32]).decode('utf-8')
+        if not WALLET_PUBKEY_B58:
+            logger.error("❌ Balance error: no wallet loaded")
+            return 1000.0
         
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
             "method": "getBalance",
-            "params": [wallet_pubkey]
+            "params": [WALLET_PUBKEY_B58]
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(RPC_URL, json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                if "result" in result:
-                    sol_balance_lamports = result["result"]["value"]
-                    sol_balance = sol_balance_lamports / LAMPORTS_PER_SOL
-                    
-                    # Get SOL price in USD
-                    sol_price = await get_sol_price_usd()
-                    if sol_price:
-                        return sol_balance * sol_price
-                    else:
-                        return sol_balance * 100.0  # Fallback price
+        # Balance and SOL/USD price are independent, so fetch them together
+        response, sol_price = await asyncio.gather(
+            http_post(RPC_URL, json=payload, timeout=10.0),
+            get_sol_price_usd_cached()
+        )
+        if response.status_code == 200:
+            result = json_loads(response.content)
+            if "result" in result:
+                sol_balance_lamports = result["result"]["value"]
+                sol_balance = sol_balance_lamports / LAMPORTS_PER_SOL
+                
+                if sol_price:
+                    balance_usd = sol_balance * sol_price
+                    _balance_cache["value"] = balance_usd
+                    _balance_cache["ts"] = time.monotonic()
+                    return balance_usd
                 else:
-                    print(f"❌ Balance RPC Error: {result}")
-                    return 1000.0
+                    return sol_balance * 100.0  # Fallback price
             else:
-                print(f"❌ Balance HTTP Error: {response.status_code}")
+                logger.error("❌ Balance RPC Error: %s", result)
                 return 1000.0
+        else:
+            logger.error("❌ Balance HTTP Error: %s", response.status_code)
+            return 1000.0
                 
     except Exception as e:
-        print(f"❌ Balance error: {e}")
+        logger.error("❌ Balance error: %s", e)
         return 1000.0  # Fallback balance
 
+async def menu_balance_usd() -> float:
+    """Wallet balance for menus; 0 when no wallet is connected"""
+    if not WALLET_PRIVATE_KEY:
+        return 0.0
+    # get_wallet_balance_usd already turns RPC/HTTP failures into a fallback value
+    return await get_wallet_balance_usd()
+
 async def get_sol_price_usd() -> Optional[float]:
     """Get SOL price in USD with retry mechanism"""
     max_retries = 3
@@ -370,74 +870,130 @@ async def get_sol_price_usd() -> Optional[float]:
             if attempt > 0:
                 await asyncio.sleep(2 + attempt)  # Progressive delay
             
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get("https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd")
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    price = data["solana"]["usd"]
-                    print(f"✅ SOL price fetched: ${price:.2f} (attempt {attempt + 1})")
-                    return price
-                elif response.status_code == 429:
-                    print(f"⚠️ CoinGecko rate limited, retrying in {2 + attempt}s...")
-                    continue
-                else:
-                    print(f"⚠️ CoinGecko HTTP {response.status_code} (attempt {attempt + 1})")
+            response = await http_get("https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd", timeout=5.0)
+            
+            if response.status_code == 200:
+                data = json_loads(response.content)
+                price = data["solana"]["usd"]
+                logger.info("✅ SOL price fetched: $%.2f (attempt %s)", price, attempt + 1)
+                return price
+            elif response.status_code == 429:
+                logger.warning("⚠️ CoinGecko rate limited, retrying in %ss...", 2 + attempt)
+                continue
+            else:
+                logger.warning("⚠️ CoinGecko HTTP %s (attempt %s)", response.status_code, attempt + 1)
                     
         except asyncio.TimeoutError:
-            print(f"⏰ SOL price timeout (attempt {attempt + 1})")
+            logger.warning("⏰ SOL price timeout (attempt %s)", attempt + 1)
         except Exception as e:
-            print(f"❌ SOL price error: {e} (attempt {attempt + 1})")
+            logger.error("❌ SOL price error: %s (attempt %s)", e, attempt + 1)
     
-    print(f"❌ Failed to fetch SOL price after {max_retries} attempts")
+    logger.error("❌ Failed to fetch SOL price after %s attempts", max_retries)
     return None
 
+async def get_sol_price_usd_cached() -> Optional[float]:
+    """Get SOL price in USD, reusing the last value for SOL_PRICE_TTL_SECONDS"""
+    if _sol_usd_cache["value"] is not None and time.monotonic() - _sol_usd_cache["ts"] < SOL_PRICE_TTL_SECONDS:
+        return _sol_usd_cache["value"]
+    
+    price = await get_sol_price_usd()
+    if price:
+        _sol_usd_cache["value"] = price
+        _sol_usd_cache["ts"] = time.monotonic()
+    return price
+
+async def warm_up():
+    """Open pooled connections and fill the sizing caches so the first /buy starts warm"""
+    await asyncio.gather(
+        get_sol_price_usd_cached(),         # CoinGecko + SOL/USD cache
+        get_wallet_balance_usd(),           # RPC + balance cache
+        get_priority_fee_cached(),          # Helius fee estimate cache
+        get_prices_vs_sol([SOL_MINT]),      # Jupiter price host
+        return_exceptions=True
+    )
+    logger.info("🔥 Connections and price caches warmed")
+
 async def calculate_trade_amount() -> float:
     """Calculate trade amount based on percentage or fixed amount"""
     if USE_PERCENTAGE_TRADING:
         try:
             wallet_balance = await get_wallet_balance_usd()
             percentage_amount = wallet_balance * (TRADE_PERCENTAGE / 100.0)
-            print(f"💰 Wallet Balance: ${wallet_balance:.2f}")
-            print(f"💰 Trade Amount ({TRADE_PERCENTAGE}%): ${percentage_amount:.2f}")
+            logger.info("💰 Wallet Balance: $%.2f", wallet_balance)
+            logger.info("💰 Trade Amount (%s%%): $%.2f", TRADE_PERCENTAGE, percentage_amount)
             return percentage_amount
         except Exception as e:
-            print(f"❌ Percentage calculation failed: {e}")
-            print(f"💰 Using fallback amount: ${TRADE_AMOUNT_USD}")
+            logger.error("❌ Percentage calculation failed: %s", e)
+            logger.info("💰 Using fallback amount: $%s", TRADE_AMOUNT_USD)
             return TRADE_AMOUNT_USD
     else:
         return TRADE_AMOUNT_USD
 
+def b58encode(data: bytes) -> str:
+    return b58.b58encode(data).decode('utf-8')
+
+def b58decode(text: str) -> bytes:
+    return b58.b58decode(text.encode())
+
 def parse_private_key(private_key_str: str) -> bytes:
     """Parse private key from string"""
     if not private_key_str:
-        print("❌ Private key parsing error: empty private key")
+        logger.error("❌ Private key parsing error: empty private key")
         return None
         
     try:
         # Try base58 decoding first (88 or 87 characters)
         if len(private_key_str) in [87, 88]:
-            return base58.b58decode(private_key_str)
+            return b58decode(private_key_str)
         # Try as JSON array
         elif private_key_str.startswith('['):
-            key_array = json.loads(private_key_str)
+            key_array = json_loads(private_key_str)
             return bytes(key_array)
         else:
             # Try as hex string
             return bytes.fromhex(private_key_str)
     except Exception as e:
-        print(f"❌ Private key parsing error: {e}")
+        logger.error("❌ Private key parsing error: %s", e)
         return None
 
-def sign_transaction(transaction_bytes: bytes, private_key: bytes) -> bytes:
-    """Sign transaction with private key (simplified)"""
+def _read_shortvec(buf: bytes, offset: int) -> Tuple[int, int]:
+    """Decode a Solana compact-u16 at offset, returning (value, next_offset)"""
+    value = shift = 0
+    while True:
+        byte = buf[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+def sign_transaction(transaction_bytes: bytes, signing_key: SigningKey) -> Optional[bytes]:
+    """Sign a serialized (legacy or v0) transaction with Ed25519 in our signer slot"""
     try:
-        # This is a simplified signing - in production you'd use proper Ed25519 signing
-        # For now, we'll return the transaction as-is (Jupiter handles signing)
-        return transaction_bytes
+        # Wire format: shortvec signature count, 64-byte signatures, then the message
+        num_sigs, sigs_start = _read_shortvec(transaction_bytes, 0)
+        message_start = sigs_start + 64 * num_sigs
+        message = transaction_bytes[message_start:]
+
+        # Message: optional version prefix (high bit set), 3-byte header, shortvec account keys
+        keys_offset = 4 if message[0] & 0x80 else 3
+        num_keys, keys_start = _read_shortvec(message, keys_offset)
+        our_key = signing_key.verify_key.encode()
+        slot = next(
+            (i for i in range(min(num_sigs, num_keys))
+             if message[keys_start + 32 * i:keys_start + 32 * (i + 1)] == our_key),
+            None,
+        )
+        if slot is None:
+            logger.error("❌ Signing error: wallet is not a required signer of this transaction")
+            return None
+
+        signature = signing_key.sign(message).signature
+        sig_offset = sigs_start + 64 * slot
+        return transaction_bytes[:sig_offset] + signature + transaction_bytes[sig_offset + 64:]
     except Exception as e:
-        print(f"❌ Signing error: {e}")
-        return transaction_bytes
+        logger.error("❌ Signing error: %s", e)
+        return None
 
 async def send_transaction(transaction_data: dict) -> Optional[str]:
     """Send transaction to Solana network"""
@@ -448,15 +1004,15 @@ async def send_transaction(transaction_data: dict) -> Optional[str]:
         # Decode the transaction
         transaction_bytes = base64.b64decode(transaction_data["swapTransaction"])
         
-        # Parse and sign with private key
-        private_key = parse_private_key(WALLET_PRIVATE_KEY)
-        if private_key:
-            signed_transaction = sign_transaction(transaction_bytes, private_key)
-        else:
-            print("❌ Failed to parse private key, using unsigned transaction")
-            signed_transaction = transaction_bytes
+        # Sign with the key derived in load_wallet
+        if WALLET_SIGNING_KEY is None:
+            logger.error("❌ No wallet loaded, cannot sign transaction")
+            return None
+        signed_transaction = sign_transaction(transaction_bytes, WALLET_SIGNING_KEY)
+        if signed_transaction is None:
+            return None
         
-        # Send to Solana RPC
+        # Skip the preflight simulation round-trip; landing the tx matters more than validating it
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -465,54 +1021,60 @@ async def send_transaction(transaction_data: dict) -> Optional[str]:
                 base64.b64encode(signed_transaction).decode('utf-8'),
                 {
                     "encoding": "base64",
-                    "skipPreflight": False,
-                    "preflightCommitment": "confirmed",
-                    "maxRetries": 3
+                    "skipPreflight": True,
+                    "maxRetries": 0
                 }
             ]
         }
         
-        print(f"🔄 Sending transaction to Solana...")
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(RPC_URL, json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                if "result" in result:
-                    tx_signature = result["result"]
-                    print(f"✅ Transaction sent: {tx_signature}")
+        logger.info("🔄 Sending transaction to Solana (%s endpoint(s))...", len(SEND_RPC_URLS))
+        sends = [asyncio.create_task(_send_raw_transaction(url, payload)) for url in SEND_RPC_URLS]
+        try:
+            for next_done in asyncio.as_completed(sends):
+                tx_signature = await next_done
+                if tx_signature:
+                    logger.info("✅ Transaction sent: %s", tx_signature)
                     return tx_signature
-                else:
-                    print(f"❌ RPC Error: {result}")
-                    return None
-            else:
-                print(f"❌ HTTP Error: {response.status_code}")
-                return None
+        finally:
+            for task in sends:
+                task.cancel()
+        return None
                 
     except Exception as e:
-        print(f"❌ Transaction error: {e}")
+        logger.error("❌ Transaction error: %s", e)
         return None
 
+async def _send_raw_transaction(url: str, payload: dict) -> Optional[str]:
+    """Post a signed sendTransaction to one endpoint, returning the signature if accepted"""
+    try:
+        response = await http_post(url, json=payload, timeout=10.0)
+        if response.status_code != 200:
+            logger.error("❌ HTTP Error: %s", response.status_code)
+            return None
+        result = json_loads(response.content)
+        if "result" in result:
+            return result["result"]
+        logger.error("❌ RPC Error: %s", result)
+    except Exception as e:
+        logger.error("❌ Send error: %s", e)
+    return None
+
 # ================== EXECUTION (DRY/LIVE) ==================
-async def jupiter_buy(mint: str, usd_amount: float) -> str:
+async def jupiter_buy(mint: str, usd_amount: float, quote: Optional[dict] = None) -> str:
     if DRY_RUN:
         return f"[DRY] BUY {mint} for ${usd_amount:.2f}"
     
     try:
-        # Convert USD to SOL amount (simplified - you might want to use a price feed)
-        sol_amount = usd_amount / 100  # Assuming $100 per SOL, adjust as needed
-        amount_lamports = int(sol_amount * LAMPORTS_PER_SOL)
+        # Convert USD to SOL amount at the cached SOL/USD price
+        amount_lamports = await _usd_to_lamports(usd_amount)
         
-        # Get quote
-        quote = await get_jupiter_quote(SOL_MINT, mint, amount_lamports)
+        # Use the caller's prewarmed quote when given, else quote now
+        quote = quote or await get_jupiter_quote(SOL_MINT, mint, amount_lamports)
         if not quote:
             return f"❌ Failed to get quote for {mint}"
         
         # Get wallet public key
-        private_key = parse_private_key(WALLET_PRIVATE_KEY)
-        if private_key:
-            wallet_pubkey = base58.b58encode(private_key[:32]).decode('utf-8')
-        else:
-            wallet_pubkey = "mock_wallet_address"
+        wallet_pubkey = WALLET_PUBKEY_B58 or "mock_wallet_address"
         
         # Get swap transaction
         swap_data = await get_jupiter_swap_transaction(quote, wallet_pubkey)
@@ -552,11 +1114,7 @@ async def jupiter_sell(mint: str, sell_pct: float) -> str:
             return f"❌ Failed to get sell quote for {mint}"
         
         # Get wallet public key
-        private_key = parse_private_key(WALLET_PRIVATE_KEY)
-        if private_key:
-            wallet_pubkey = base58.b58encode(private_key[:32]).decode('utf-8')
-        else:
-            wallet_pubkey = "mock_wallet_address"
+        wallet_pubkey = WALLET_PUBKEY_B58 or "mock_wallet_address"
         
         # Get swap transaction
         swap_data = await get_jupiter_swap_transaction(quote, wallet_pubkey)
@@ -574,26 +1132,29 @@ async def jupiter_sell(mint: str, sell_pct: float) -> str:
         return f"❌ Sell error: {str(e)}"
 
 # ================== LOGIC ==================
+# Per-tick exit decision for a position
+EXIT_NONE, EXIT_STOP_LOSS, EXIT_TRAIL, EXIT_LADDER = range(4)
+
+def evaluate_exit(pos: Position, price: float) -> int:
+    """EXIT_* code for this tick; pure, so quiet ticks never reach the sell/send path"""
+    if price <= pos.stop_price:
+        return EXIT_STOP_LOSS
+    # trailing stop from peak (only once above entry)
+    if pos.peak_price > pos.entry_price and price <= pos.trail_stop_price:
+        return EXIT_TRAIL
+    if price >= pos.next_ladder_price:
+        return EXIT_LADDER
+    return EXIT_NONE
+
 async def apply_ladder(pos: Position, price: float, send):
-    x = price / pos.entry_price
-    for step, val in TP_STEPS:
-        if step == "rest":
-            continue
-        # e.g. "2x"
-        try:
-            mult = float(step.replace("x", ""))
-        except:
-            continue
-        key = f"{mult}x"
-        if x >= mult and not pos.ladder_done.get(key, False):
-            # val is percentage like "25"
-            try:
-                sell_pct = float(val)
-            except:
-                continue
+    for trigger, (_, sell_pct, key, bit) in zip(pos.ladder_prices, PARSED_TP_STEPS):
+        if price < trigger:
+            break  # steps are sorted, nothing higher can trigger
+        if not pos.ladder_done & bit:
             tx = await jupiter_sell(pos.mint, sell_pct)
             pos.remaining_pct = max(0.0, pos.remaining_pct - sell_pct)
-            pos.ladder_done[key] = True
+            pos.ladder_done |= bit
+            pos.refresh_next_ladder_price()
             pos.last_exit_price = price
             await send(f"🎯 {key} hit → sold {sell_pct}% | remaining {pos.remaining_pct:.1f}% | {tx}")
             if pos.remaining_pct <= 0.1:
@@ -601,25 +1162,48 @@ async def apply_ladder(pos: Position, price: float, send):
                 await send("✅ Fully exited via ladder.")
                 return
 
-async def watcher(pos: Position, send):
-    await send(f"👀 Watching {pos.mint} | entry {pos.entry_price:.10f} SOL")
-    rest_trail = TRAIL_FROM_PEAK_PCT  # default
-    # parse "rest:trailXX" if present
-    for step, val in TP_STEPS:
-        if step == "rest" and val.startswith("trail"):
-            try:
-                rest_trail = float(val.replace("trail", ""))
-            except:
-                pass
+# One slot per open position, taken before buying so a bought token is never left unwatched
+WATCHER_SEM = asyncio.Semaphore(MAX_CONCURRENT_WATCHERS)
+watcher_tasks: Set[asyncio.Task] = set()  # strong refs so running watchers aren't garbage-collected
+
+def _watcher_done(task: asyncio.Task):
+    watcher_tasks.discard(task)
+    WATCHER_SEM.release()
+
+def start_watcher(pos: Position, send):
+    """Spawn a watcher for pos; the caller must already hold a WATCHER_SEM slot"""
+    task = asyncio.create_task(watcher(pos, send))
+    watcher_tasks.add(task)
+    # Released here rather than in watcher() so a task cancelled before it starts still frees its slot
+    task.add_done_callback(_watcher_done)
 
+async def watcher(pos: Position, send):
+    watch_mint(pos.mint)
+    try:
+        try:
+            await send(f"👀 Watching {pos.mint} | entry {pos.entry_price:.10f} SOL")
+        except Exception as e:
+            logger.warning("⚠️ Watch notice for %s not sent: %s", pos.mint, e)
+        await _watch_position(pos, send)
+    finally:
+        unwatch_mint(pos.mint)
+        # Closed positions leave the table so it only ever holds live ones
+        # (a re-entry has already replaced it with its own Position)
+        if positions.get(pos.mint) is pos:
+            del positions[pos.mint]
+
+async def _watch_position(pos: Position, send):
+    # The price pump refreshes watched mints on every push and at least every
+    # PUSH_FALLBACK_SECONDS, so a cached price that old is still current
+    max_price_age = PUSH_FALLBACK_SECONDS + PRICE_POLL_SECONDS
     consecutive_failures = 0
     max_consecutive_failures = 10
     
     while pos.active:
-        price = await get_price_vs_sol(pos.mint)
+        price = await get_price_cached(pos.mint, max_age=max_price_age)
         if price is None:
             consecutive_failures += 1
-            print(f"⚠️ Price fetch failed for {pos.mint} (failure #{consecutive_failures})")
+            logger.warning("⚠️ Price fetch failed for %s (failure #%s)", pos.mint, consecutive_failures)
             
             if consecutive_failures >= max_consecutive_failures:
                 await send(f"❌ Too many price fetch failures for {pos.mint}. Stopping watcher.")
@@ -635,31 +1219,27 @@ async def watcher(pos: Position, send):
 
         if price > pos.peak_price:
             pos.peak_price = price
+            pos.trail_stop_price = price * TRAIL_PRICE_FACTOR
 
-        change = pct(pos.entry_price, price)     # from entry
-        drop = pct(pos.peak_price, price)        # negative when dropping
-
-        # hard SL
-        if change <= STOP_LOSS_PCT:
+        decision = evaluate_exit(pos, price)
+        if decision == EXIT_STOP_LOSS:
             tx = await jupiter_sell(pos.mint, pos.remaining_pct)
             await send(f"🛑 Hard SL {STOP_LOSS_PCT}% hit. Exit {pos.remaining_pct:.1f}% | {tx}")
             pos.last_exit_price = price
             pos.active = False
             break
-
-        # trailing stop from peak (only once above entry)
-        if pos.peak_price > pos.entry_price and drop <= -rest_trail:
+        if decision == EXIT_TRAIL:
             tx = await jupiter_sell(pos.mint, pos.remaining_pct)
-            await send(f"⛳ Trailing stop {rest_trail}% hit. Exit {pos.remaining_pct:.1f}% | {tx}")
+            await send(f"⛳ Trailing stop {REST_TRAIL_PCT}% hit. Exit {pos.remaining_pct:.1f}% | {tx}")
             pos.last_exit_price = price
             pos.active = False
             break
+        if decision == EXIT_LADDER:
+            await apply_ladder(pos, price, send)
+            if not pos.active:
+                break
 
-        await apply_ladder(pos, price, send)
-        if not pos.active:
-            break
-
-        await asyncio.sleep(PRICE_POLL_SECONDS)
+        await wait_for_price_update(pos.mint)
 
     # single re-entry (if allowed)
     if REENTRY_ENABLED and pos.reentries_used < MAX_REENTRIES_PER_TOKEN and pos.last_exit_price:
@@ -670,10 +1250,10 @@ async def watcher(pos: Position, send):
         max_reentry_failures = 5
         
         while time.time() < deadline:
-            price = await get_price_vs_sol(pos.mint)
+            price = await get_price_cached(pos.mint, max_age=max_price_age)
             if price is None:
                 reentry_failures += 1
-                print(f"⚠️ Re-entry price fetch failed for {pos.mint} (failure #{reentry_failures})")
+                logger.warning("⚠️ Re-entry price fetch failed for %s (failure #%s)", pos.mint, reentry_failures)
                 
                 if reentry_failures >= max_reentry_failures:
                     await send(f"❌ Too many price fetch failures during re-entry for {pos.mint}. Aborting re-entry.")
@@ -699,12 +1279,393 @@ async def watcher(pos: Position, send):
                 positions[pos.mint] = new_pos
                 await watcher(new_pos, send)
                 return
-            await asyncio.sleep(PRICE_POLL_SECONDS)
+            # The mint stays watched while armed, so sleep until the pump publishes a new price
+            await wait_for_price_update(pos.mint)
         await send("⌛ Re-entry window expired.")
 
 # ================== TELEGRAM ==================
-async def send_chat(ctx: ContextTypes.DEFAULT_TYPE, chat_id: int, text: str):
-    await ctx.bot.send_message(chat_id=chat_id, text=text, disable_web_page_preview=True)
+async def send_chat(ctx: ContextTypes.DEFAULT_TYPE, chat_id: int, text: str, parse_mode=None):
+    await ctx.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode, disable_web_page_preview=True)
+
+# ================== KEYBOARDS ==================
+# Static menus never change, so each markup is built once and shared by every tap
+MAIN_MENU_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("⚓ Wallet Dock", callback_data="wallet_dock")],
+    [InlineKeyboardButton("⚔️ Trade Settings", callback_data="trade_settings")],
+    [InlineKeyboardButton("🌊 Leviathan Mode", callback_data="leviathan_mode")],
+    [InlineKeyboardButton("🪝 Sniping Grounds", callback_data="sniping_grounds")],
+    [InlineKeyboardButton("📜 Navigation & Logs", callback_data="navigation_logs")],
+    [InlineKeyboardButton("⚙️ Leviathan Forge", callback_data="leviathan_forge")]
+])
+WALLET_DOCK_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Add Vessel", callback_data="add_wallet")],
+    [InlineKeyboardButton("👁️ View Fleet", callback_data="view_fleet")],
+    [InlineKeyboardButton("🗑️ Remove Vessel", callback_data="remove_wallet")],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
+])
+TRADE_SETTINGS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 Set Tribute %", callback_data="set_percentage")],
+    [InlineKeyboardButton("💰 Set Fixed Strike", callback_data="set_fixed")],
+    [InlineKeyboardButton("🔍 Check Current Loadout", callback_data="check_settings")],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
+])
+LEVIATHAN_MODE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🌊 Awaken Beast", callback_data="awaken_beast")],
+    [InlineKeyboardButton("😴 Send to Depths", callback_data="sleep_beast")],
+    [InlineKeyboardButton("📊 Status of the Beast", callback_data="beast_status")],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
+])
+SNIPING_GROUNDS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📍 Mark New Waters", callback_data="add_channel")],
+    [InlineKeyboardButton("👁️ Survey the Waters", callback_data="view_channels")],
+    [InlineKeyboardButton("🗑️ Abandon Waters", callback_data="remove_channel")],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
+])
+NAVIGATION_LOGS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📜 Battle History", callback_data="battle_history")],
+    [InlineKeyboardButton("💰 War Chest", callback_data="war_chest")],
+    [InlineKeyboardButton("🔔 Signals & Whispers", callback_data="notifications")],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
+])
+LEVIATHAN_FORGE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🛡️ Adjust Trail & Stop", callback_data="adjust_stops")],
+    [InlineKeyboardButton("📈 Ladder Strategy", callback_data="ladder_strategy")],
+    [InlineKeyboardButton("♻️ Re-Entry Tide", callback_data="reentry_tide")],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
+])
+REMOVE_WALLET_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🗑️ Confirm Remove", callback_data="confirm_remove")],
+    [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
+])
+# Single source for the sizing buttons and for validating their callbacks
+PCT_OPTIONS = (5.0, 10.0, 15.0, 20.0, 25.0)
+FIXED_OPTIONS = (10, 20, 50, 100, 200, 500)
+BACK_TRADE_SETTINGS_BTN = InlineKeyboardButton("🔙 Back to Trade Settings", callback_data="trade_settings")
+SET_PERCENTAGE_KB = InlineKeyboardMarkup(
+    [[InlineKeyboardButton(f"{p:g}%", callback_data=f"set_pct_{p}")] for p in PCT_OPTIONS]
+    + [[BACK_TRADE_SETTINGS_BTN]]
+)
+SET_FIXED_KB = InlineKeyboardMarkup(
+    [[InlineKeyboardButton(f"${a}", callback_data=f"set_fixed_{a}")] for a in FIXED_OPTIONS]
+    + [[BACK_TRADE_SETTINGS_BTN]]
+)
+
+BACK_TO_WALLET_DOCK_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
+])
+BACK_TO_TRADE_SETTINGS_KB = InlineKeyboardMarkup([[BACK_TRADE_SETTINGS_BTN]])
+BACK_TO_LEVIATHAN_MODE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back to Leviathan Mode", callback_data="leviathan_mode")]
+])
+BACK_SNIPING_GROUNDS_BTN = InlineKeyboardButton("🔙 Back to Sniping Grounds", callback_data="sniping_grounds")
+BACK_TO_SNIPING_GROUNDS_KB = InlineKeyboardMarkup([[BACK_SNIPING_GROUNDS_BTN]])
+BACK_TO_NAVIGATION_LOGS_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back to Navigation & Logs", callback_data="navigation_logs")]
+])
+BACK_TO_LEVIATHAN_FORGE_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back to Leviathan Forge", callback_data="leviathan_forge")]
+])
+
+# ================== MENU TEXT ==================
+# Static bodies are built once; dynamic menus are format_map templates
+WALLET_DOCK_TEXT = (
+    "⚓ <b>Wallet Dock</b>\n\n"
+    "Manage your connected wallets and vessel fleet.\n\n"
+    "• <b>Add Vessel</b>: Connect a new wallet to the Leviathan\n"
+    "• <b>View Fleet</b>: See all connected wallets and balances\n"
+    "• <b>Remove Vessel</b>: Disconnect a wallet from the fleet"
+)
+
+TRADE_SETTINGS_TEXT = (
+    "⚔️ <b>Trade Settings</b>\n\n"
+    "Configure your trading strategy and strike patterns.\n\n"
+    "• <b>Set Tribute %</b>: Choose % of wallet balance per trade (5%, 10%, 20%)\n"
+    "• <b>Set Fixed Strike</b>: Choose fixed trade sizes ($10, $20, $50, etc.)\n"
+    "• <b>Check Current Loadout</b>: View active trade settings"
+)
+
+SNIPING_GROUNDS_TEXT = (
+    "🪝 <b>Sniping Grounds</b>\n\n"
+    "Manage your hunting grounds and signal sources.\n\n"
+    "• <b>Mark New Waters</b>: Add Telegram groups to scan/snipe\n"
+    "• <b>Survey the Waters</b>: Show current groups monitored\n"
+    "• <b>Abandon Waters</b>: Remove groups from monitoring"
+)
+
+NAVIGATION_LOGS_TEXT = (
+    "📜 <b>Navigation &amp; Logs</b>\n\n"
+    "Track your conquests and manage notifications.\n\n"
+    "• <b>Battle History</b>: Show recent trades (PnL logs)\n"
+    "• <b>War Chest</b>: Show current profits/losses\n"
+    "• <b>Signals &amp; Whispers</b>: Notifications / alerts toggle"
+)
+
+LEVIATHAN_FORGE_TEXT = (
+    "⚙️ <b>Leviathan Forge</b>\n\n"
+    "Fine-tune your trading parameters and strategies.\n\n"
+    "• <b>Adjust Trail &amp; Stop</b>: Edit trailing stop %, stop loss %\n"
+    "• <b>Ladder Strategy</b>: Adjust scaling buy levels (2x, 4x, 10x)\n"
+    "• <b>Re-Entry Tide</b>: Toggle re-entry strategy on/off"
+)
+
+ADD_WALLET_TEXT = (
+    "➕ <b>Add Vessel</b>\n\n"
+    "To add a new wallet to the Leviathan fleet:\n\n"
+    "1. Send your wallet private key as a message\n"
+    "2. Format: <code>YOUR_PRIVATE_KEY</code> (base58, hex, or JSON array)\n"
+    "3. The wallet will be added to the fleet\n\n"
+    "⚠️ <b>Security Note</b>: Only send private keys in private chat!\n\n"
+    "<b>Status</b>: ⏳ Waiting for private key..."
+)
+
+WALLET_REMOVED_TEXT = (
+    "✅ <b>Vessel Removed Successfully</b>\n\n"
+    "The wallet has been disconnected from the Leviathan fleet.\n\n"
+    "<b>Status:</b>\n"
+    "• Wallet: Disconnected\n"
+    "• Trading: Paused\n"
+    "• Fleet Status: Empty\n\n"
+    "To resume trading, add a new vessel using 'Add Vessel'."
+)
+
+SET_PERCENTAGE_TEXT = (
+    "📊 <b>Set Tribute %</b>\n\n"
+    "Choose the percentage of wallet balance to use per trade:\n\n"
+    "<b>Current Setting:</b> 5% of wallet balance\n\n"
+    "Select a new percentage:"
+)
+
+SET_FIXED_TEXT = (
+    "💰 <b>Set Fixed Strike</b>\n\n"
+    "Choose a fixed dollar amount per trade:\n\n"
+    "<b>Current Setting:</b> 5% of wallet (Dynamic)\n\n"
+    "Select a fixed amount:"
+)
+
+BEAST_AWAKENED_TEXT = (
+    "🌊 <b>Beast Awakened!</b>\n\n"
+    "The Leviathan has risen from the depths!\n\n"
+    "✅ <b>Status</b>: LIVE TRADING ACTIVE\n"
+    "⚡ <b>Auto-trading</b>: ENABLED\n"
+    "🎯 <b>Target</b>: @gem_tools_calls\n"
+    "💰 <b>Strike Force</b>: 5% of wallet\n\n"
+    "The beast hunts..."
+)
+
+BEAST_SLEEPING_TEXT = (
+    "😴 <b>Beast Sent to Depths</b>\n\n"
+    "The Leviathan has returned to slumber.\n\n"
+    "⏸️ <b>Status</b>: TRADING PAUSED\n"
+    "💤 <b>Auto-trading</b>: DISABLED\n"
+    "👁️ <b>Monitoring</b>: Still watching channels\n"
+    "🛡️ <b>Protection</b>: All positions safe\n\n"
+    "The beast sleeps..."
+)
+
+BATTLE_HISTORY_TEXT = (
+    "📜 <b>Battle History</b>\n\n"
+    "<b>Recent Trades:</b>\n"
+    "• No trades executed yet\n\n"
+    "<b>Trading Statistics:</b>\n"
+    "• Total Trades: 0\n"
+    "• Successful Trades: 0\n"
+    "• Failed Trades: 0\n"
+    "• Win Rate: N/A\n\n"
+    "<b>Last 24 Hours:</b>\n"
+    "• Trades: 0\n"
+    "• Volume: $0.00\n"
+    "• PnL: $0.00"
+)
+
+NOTIFICATIONS_TEXT = (
+    "🔔 <b>Signals &amp; Whispers</b>\n\n"
+    "<b>Notification Settings:</b>\n"
+    "• Trade Executions: ✅ Enabled\n"
+    "• Price Alerts: ✅ Enabled\n"
+    "• Error Notifications: ✅ Enabled\n"
+    "• Channel Signals: ✅ Enabled\n\n"
+    "<b>Alert Types:</b>\n"
+    "• Buy/Sell Confirmations\n"
+    "• Stop Loss Triggers\n"
+    "• Take Profit Hits\n"
+    "• Re-entry Alerts\n"
+    "• System Errors\n\n"
+    "All notifications are sent to this chat."
+)
+
+# Config values never change at runtime, so their display strings are built once
+MENU_CONFIG = {
+    "stop_loss_pct": STOP_LOSS_PCT,
+    "trail_pct": TRAIL_FROM_PEAK_PCT,
+    "tp_ladder": TP_LADDER,
+    "reentry": "Enabled" if REENTRY_ENABLED else "Disabled",
+    "max_reentries": MAX_REENTRIES_PER_TOKEN,
+    "reentry_confirm_pct": REENTRY_CONFIRM_PCT,
+}
+
+MAIN_MENU_TEMPLATE = (
+    "🌊 Welcome to Leviathan86Bot 🐉\n\n"
+    "From the depths of the crypto seas, the Leviathan rises.\n"
+    "An unstoppable force, carving through the tides of meme coins and alt markets alike.\n\n"
+    "With your wallets as its vessel, Leviathan86Bot hunts, trades, and strikes automatically — seizing opportunity before it slips beneath the waves.\n\n"
+    "Brace yourself. Once awakened, the Leviathan doesn't ask. It takes.\n\n"
+    "⚡️ Connect your wallet. Unleash the beast. Rule the crypton seas.\n\n"
+    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+    "🤖 Bot Status: {bot_status}\n"
+    "💰 Trading: {trading_mode} (${trade_amount:.2f})\n"
+    "{banner}"
+)
+
+# Config tail of the main menu; only the channel list can change, so it is
+# rebuilt on channel mutations instead of on every render
+MAIN_MENU_BANNER_TEMPLATE = (
+    "🛡️ SL: {stop_loss_pct}% | Trail: {trail_pct}% | Ladder: 2x:30%,5x:20%,10x:10%,15x:15%,20x:15%\n"
+    "♻️ Re-entry: {reentry} (Buyer preference)\n"
+    "👀 Watching: {channels}"
+)
+_main_menu_banner = ""
+
+def _rebuild_main_menu_banner():
+    global _main_menu_banner
+    _main_menu_banner = MAIN_MENU_BANNER_TEMPLATE.format_map({**MENU_CONFIG, "channels": _channels_joined})
+
+_rebuild_main_menu_banner()
+
+LEVIATHAN_MODE_TEMPLATE = (
+    "🌊 <b>Leviathan Mode</b>\n\n"
+    "Control the beast's trading state.\n\n"
+    "<b>Current Status</b>: {status}\n\n"
+    "• <b>Awaken Beast</b>: Turn bot ON (auto-trading active)\n"
+    "• <b>Send to Depths</b>: Turn bot OFF (pause trading)\n"
+    "• <b>Status of the Beast</b>: Show if bot is currently trading or sleeping"
+)
+
+CHECK_SETTINGS_TEMPLATE = (
+    "🔍 <b>Check Current Loadout</b>\n\n"
+    "<b>Trading Configuration:</b>\n"
+    "• <b>Mode</b>: {trading_mode}\n"
+    "• <b>Amount</b>: ${trade_amount:.2f}\n"
+    "• <b>Stop Loss</b>: {stop_loss_pct}%\n"
+    "• <b>Trailing Stop</b>: {trail_pct}%\n"
+    "• <b>Take Profit Ladder</b>: {tp_ladder}\n"
+    "• <b>Re-entry</b>: {reentry}\n"
+    "• <b>Max Re-entries</b>: {max_reentries}\n"
+    "• <b>Re-entry Confirm</b>: +{reentry_confirm_pct}%\n\n"
+    "<b>Current Status:</b>\n"
+    "• Bot Mode: {bot_mode}\n"
+    "• Channels: {channel_count} monitored"
+)
+
+BEAST_STATUS_TEMPLATE = (
+    "📊 <b>Status of the Beast</b>\n\n"
+    "<b>Current State</b>: {status}\n"
+    "<b>Trading Mode</b>: {mode}\n"
+    "<b>Auto-trading</b>: {auto_trading}\n"
+    "<b>Channels Monitored</b>: {channel_count}\n"
+    "<b>Last Activity</b>: {last_activity}\n\n"
+    "<b>Fleet Status:</b>\n"
+    "• Wallets Connected: 1\n"
+    "• Ready for Action: {ready}\n"
+    "• Monitoring: @gem_tools_calls"
+)
+
+WAR_CHEST_TEMPLATE = (
+    "💰 <b>War Chest</b>\n\n"
+    "<b>Current Holdings:</b>\n"
+    "• SOL Balance: ${balance_usd:.2f} USD\n"
+    "• Available for Trading: ${available_usd:.2f} (5%)\n\n"
+    "<b>Trading Performance:</b>\n"
+    "• Total PnL: $0.00\n"
+    "• Daily PnL: $0.00\n"
+    "• Best Trade: N/A\n"
+    "• Worst Trade: N/A\n\n"
+    "<b>Risk Management:</b>\n"
+    "• Stop Loss: {stop_loss_pct}%\n"
+    "• Trailing Stop: {trail_pct}%\n"
+    "• Max Risk per Trade: 5%"
+)
+
+FLEET_EMPTY_TEXT = (
+    "👁️ <b>View Fleet</b>\n\n"
+    "<b>Active Vessels:</b>\n"
+    "• No vessels connected\n\n"
+    "<b>Fleet Summary:</b>\n"
+    "• Total Vessels: 0\n"
+    "• Total Balance: $0.00 USD\n"
+    "• Ready for Trading: ❌\n\n"
+    "<b>Status:</b> Fleet is empty. Add a vessel to begin trading."
+)
+
+VIEW_FLEET_TEMPLATE = (
+    "👁️ <b>View Fleet</b>\n\n"
+    "<b>Active Vessels:</b>\n"
+    "• <b>Vessel 1</b>: <code>{address_head}...{address_tail}</code>\n"
+    "  💰 Balance: ${balance_usd:.2f} USD\n"
+    "  🟢 Status: Connected\n\n"
+    "<b>Fleet Summary:</b>\n"
+    "• Total Vessels: 1\n"
+    "• Total Balance: ${balance_usd:.2f} USD\n"
+    "• Ready for Trading: ✅"
+)
+
+TRIBUTE_UPDATED_TEMPLATE = (
+    "✅ <b>Tribute % Updated!</b>\n\n"
+    "<b>New Setting</b>: {percentage}% of wallet balance\n"
+    "<b>Mode</b>: Dynamic trading enabled\n\n"
+    "The Leviathan will now use {percentage}% of your wallet for each trade."
+)
+
+FIXED_STRIKE_UPDATED_TEMPLATE = (
+    "✅ <b>Fixed Strike Updated!</b>\n\n"
+    "<b>New Setting</b>: ${amount} per trade\n"
+    "<b>Mode</b>: Fixed amount trading\n\n"
+    "The Leviathan will now use exactly ${amount} for each trade."
+)
+
+CHANNEL_REMOVED_TEMPLATE = (
+    "✅ <b>Channel Removed!</b>\n\n"
+    "<b>Removed</b>: {channel}\n"
+    "<b>Remaining Channels</b>: {channels}\n\n"
+    "The Leviathan will no longer monitor this channel."
+)
+
+PRICE_UNAVAILABLE_TEMPLATE = (
+    "❌ <b>Couldn't fetch price for {mint_head}...</b>\n\n"
+    "<b>Possible reasons:</b>\n"
+    "• Token doesn't exist\n"
+    "• API rate limit exceeded\n"
+    "• Network issues\n\n"
+    "<b>Try again in a few seconds.</b>"
+)
+
+# Pure renders: a fixed body and keyboard, no state read or written
+MENUS = {
+    "wallet_dock": (WALLET_DOCK_TEXT, WALLET_DOCK_KB),
+    "trade_settings": (TRADE_SETTINGS_TEXT, TRADE_SETTINGS_KB),
+    "sniping_grounds": (SNIPING_GROUNDS_TEXT, SNIPING_GROUNDS_KB),
+    "navigation_logs": (NAVIGATION_LOGS_TEXT, NAVIGATION_LOGS_KB),
+    "leviathan_forge": (LEVIATHAN_FORGE_TEXT, LEVIATHAN_FORGE_KB),
+    "set_percentage": (SET_PERCENTAGE_TEXT, SET_PERCENTAGE_KB),
+    "set_fixed": (SET_FIXED_TEXT, SET_FIXED_KB),
+    "battle_history": (BATTLE_HISTORY_TEXT, BACK_TO_NAVIGATION_LOGS_KB),
+    "notifications": (NOTIFICATIONS_TEXT, BACK_TO_NAVIGATION_LOGS_KB),
+}
+
+@lru_cache(maxsize=1)
+def format_clock(second: int) -> str:
+    # Keyed by whole second, so a burst of renders formats the timestamp once
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+
+async def main_menu_text() -> str:
+    """Main menu body shared by /start and Back to Main"""
+    trade_amount = await calculate_trade_amount()
+    trading_mode = f"{TRADE_PERCENTAGE}% of wallet" if USE_PERCENTAGE_TRADING else f"${TRADE_AMOUNT_USD} fixed"
+    return MAIN_MENU_TEMPLATE.format_map({
+        "bot_status": "LIVE TRADING" if not DRY_RUN else "DRY RUN MODE",
+        "trading_mode": trading_mode,
+        "trade_amount": trade_amount,
+        "banner": _main_menu_banner,
+    })
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Get user information
@@ -715,45 +1676,12 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     last_name = user.last_name or ""
     full_name = f"{first_name} {last_name}".strip()
     
-    # Print user information to console
-    print(f"\n🚀 Bot Started by User:")
-    print(f"   👤 User ID: {user_id}")
-    print(f"   📛 Username: @{username}")
-    print(f"   🏷️  Full Name: {full_name}")
-    print(f"   💬 Chat ID: {update.effective_chat.id}")
-    print(f"   ⏰ Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 50)
-    
-    # Get current trade amount info
-    trade_amount = await calculate_trade_amount()
-    trading_mode = f"{TRADE_PERCENTAGE}% of wallet" if USE_PERCENTAGE_TRADING else f"${TRADE_AMOUNT_USD} fixed"
-    
-    # Create main menu
-    keyboard = [
-        [InlineKeyboardButton("⚓ Wallet Dock", callback_data="wallet_dock")],
-        [InlineKeyboardButton("⚔️ Trade Settings", callback_data="trade_settings")],
-        [InlineKeyboardButton("🌊 Leviathan Mode", callback_data="leviathan_mode")],
-        [InlineKeyboardButton("🪝 Sniping Grounds", callback_data="sniping_grounds")],
-        [InlineKeyboardButton("📜 Navigation & Logs", callback_data="navigation_logs")],
-        [InlineKeyboardButton("⚙️ Leviathan Forge", callback_data="leviathan_forge")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    logger.info("🚀 Bot started by user: id=%s username=@%s name=%s chat_id=%s",
+                user_id, username, full_name, update.effective_chat.id)
     
     await update.message.reply_text(
-        f"🌊 Welcome to Leviathan86Bot 🐉\n\n"
-        f"From the depths of the crypto seas, the Leviathan rises.\n"
-        f"An unstoppable force, carving through the tides of meme coins and alt markets alike.\n\n"
-        f"With your wallets as its vessel, Leviathan86Bot hunts, trades, and strikes automatically — seizing opportunity before it slips beneath the waves.\n\n"
-        f"Brace yourself. Once awakened, the Leviathan doesn't ask. It takes.\n\n"
-        f"⚡️ Connect your wallet. Unleash the beast. Rule the crypton seas.\n\n"
-        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        f"🤖 Bot Status: {'LIVE TRADING' if not DRY_RUN else 'DRY RUN MODE'}\n"
-        f"💰 Trading: {trading_mode} (${trade_amount:.2f})\n"
-        f"🛡️ SL: {STOP_LOSS_PCT}% | Trail: {TRAIL_FROM_PEAK_PCT}% | Ladder: 2x:30%,5x:20%,10x:10%,15x:15%,20x:15%\n"
-        f"♻️ Re-entry: {'Enabled' if REENTRY_ENABLED else 'Disabled'} (Buyer preference)\n"
-        f"👀 Watching: {', '.join(CHANNELS)}\n"
-        f"👤 User: {full_name} (@{username})",
-        reply_markup=reply_markup
+        await main_menu_text() + f"\n👤 User: {full_name} (@{username})",
+        reply_markup=MAIN_MENU_KB
     )
 
 async def cmd_buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -768,49 +1696,112 @@ async def cmd_buy(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Usage: /buy <TOKEN_MINT>")
         return
     mint = context.args[0].strip()
-    if not MINT_RE.fullmatch(mint):
+    if not is_mint_address(mint):
         await update.message.reply_text("Invalid token address.")
         return
     
-    # Print buy command info
-    print(f"\n💰 Buy Command:")
-    print(f"   👤 User: {first_name} (@{username})")
-    print(f"   🪙 Token: {mint}")
-    print(f"   💵 Amount: ${TRADE_AMOUNT_USD}")
-    print(f"   ⏰ Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 50)
-
-    # Pre-warm quote with error handling
+    logger.info("💰 Buy command: user=%s (@%s) token=%s amount=$%s",
+                first_name, username, mint, TRADE_AMOUNT_USD)
+
+    await _buy_mint(mint, chat_id, context)
+
+# One buy per mint at a time; the same call relayed by several channels
+# within SIGNAL_DEDUPE_SECONDS is only acted on once
+SIGNAL_DEDUPE_SECONDS = 60.0
+# mint -> [lock, holders + waiters]; dropped once nobody holds or awaits it
+_mint_locks: Dict[str, list] = {}
+_recent_buys: Dict[str, float] = {}  # mint -> monotonic time of last buy attempt
+
+async def _buy_mints(mints: List[str], chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+    """Buy several signalled mints concurrently; one failure doesn't abort the rest"""
+    now = time.monotonic()
+    for mint, ts in list(_recent_buys.items()):
+        if now - ts >= SIGNAL_DEDUPE_SECONDS:
+            del _recent_buys[mint]
+    fresh = []
+    for mint in mints:
+        if mint in positions and positions[mint].active:
+            continue  # already held; don't spend price/quote calls on it
+        if mint in _recent_buys:
+            logger.info("⏭️ Skipping %s: already signalled in the last %.0fs", mint, SIGNAL_DEDUPE_SECONDS)
+            continue
+        _recent_buys[mint] = now
+        fresh.append(mint)
+    mints = fresh
+    results = await asyncio.gather(*(_buy_mint(m, chat_id, context) for m in mints), return_exceptions=True)
+    for mint, result in zip(mints, results):
+        if isinstance(result, Exception):
+            logger.error("❌ Auto-buy failed for %s: %s", mint, result)
+
+async def _buy_mint(mint: str, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+    """Buy an already-validated mint and start watching it; replies go to chat_id"""
+    # Held across the awaits below so two signals can't both pass the
+    # position check and double-buy
+    entry = _mint_locks.get(mint)
+    if entry is None:
+        entry = _mint_locks[mint] = [asyncio.Lock(), 0]
+    entry[1] += 1
     try:
-        await prewarm_quote(mint)
-    except Exception as e:
-        print(f"⚠️ Pre-warm quote failed: {e}")
-    
-    # Get price with better error handling
-    print(f"🔍 Fetching price for {mint}...")
-    price = await get_price_vs_sol(mint)
-    if price is None:
-        await update.message.reply_text(
-            f"❌ **Couldn't fetch price for {mint[:8]}...**\n\n"
-            f"**Possible reasons:**\n"
-            f"• Token doesn't exist\n"
-            f"• API rate limit exceeded\n"
-            f"• Network issues\n\n"
-            f"**Try again in a few seconds.**"
-        )
-        return
+        async with entry[0]:
+            await _buy_mint_locked(mint, chat_id, context)
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _mint_locks[mint]
+
+async def _buy_mint_locked(mint: str, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
     if mint in positions and positions[mint].active:
-        await update.message.reply_text("Already in a position on this token.")
+        await send_chat(context, chat_id, "Already in a position on this token.")
+        return
+    if WATCHER_SEM.locked():
+        logger.info("⏭️ Skipping %s: already watching %s positions", mint, MAX_CONCURRENT_WATCHERS)
+        await send_chat(context, chat_id, f"⚠️ Already watching {MAX_CONCURRENT_WATCHERS} positions, skipping {mint[:8]}...")
         return
 
-    # Calculate trade amount (percentage or fixed)
-    trade_amount = await calculate_trade_amount()
-    
-    tx = await jupiter_buy(mint, trade_amount)
+    await WATCHER_SEM.acquire()
+    started = False
+    try:
+        started = await _open_position(mint, chat_id, context)
+    finally:
+        if not started:
+            WATCHER_SEM.release()
+
+async def _open_position(mint: str, chat_id: int, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    """Buy mint and hand it to a watcher; returns False if nothing was bought"""
+
+    # Price, trade size and route pre-warm are independent, so fetch them
+    # concurrently (each helper handles its own errors); the real-size quote
+    # starts as soon as the trade amount resolves, without waiting on the price
+    logger.info("🔍 Fetching price for %s...", mint)
+    started = time.monotonic()
+    amount_task = asyncio.ensure_future(calculate_trade_amount())
+    price, trade_amount, quote, _ = await asyncio.gather(
+        get_price_cached(mint),
+        amount_task,
+        prewarm_quote(mint, amount_task),
+        get_priority_fee_cached()
+    )
+    if price is None:
+        await send_chat(
+            context, chat_id,
+            PRICE_UNAVAILABLE_TEMPLATE.format(mint_head=mint[:8]),
+            parse_mode='HTML'
+        )
+        return False
+
+    if time.monotonic() - started > PREWARM_QUOTE_MAX_AGE_SECONDS:
+        quote = None  # a slow price fetch left it stale; jupiter_buy re-quotes
+
+    tx = await jupiter_buy(mint, trade_amount, quote=quote)
     pos = Position(mint=mint, entry_price=price, qty_tokens=trade_amount, peak_price=price)
     positions[mint] = pos
-    await send_chat(context, chat_id, f"🚀 Bought {mint} at {price:.10f} SOL | {tx}")
-    asyncio.create_task(watcher(pos, lambda msg: send_chat(context, chat_id, msg)))
+    # Watch first: a failed confirmation must not leave an active position unwatched
+    start_watcher(pos, lambda msg: send_chat(context, chat_id, msg))
+    try:
+        await send_chat(context, chat_id, f"🚀 Bought {mint} at {price:.10f} SOL | {tx}")
+    except Exception as e:
+        logger.warning("⚠️ Buy confirmation for %s not sent: %s", mint, e)
+    return True
 
 async def cmd_emergency_sell(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
@@ -826,8 +1817,11 @@ async def cmd_emergency_sell(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.message.reply_text("All positions exited.")
 
 def parse_signal(text: str) -> List[str]:
-    # Look for contract addresses in any message (removed keyword restriction)
-    return list(set(MINT_RE.findall(text)))
+    # Look for contract addresses in any message (removed keyword restriction);
+    # deduped in first-seen order so the first-mentioned mint is bought first
+    if len(text) < 32:
+        return []  # shorter than any mint; most chat replies stop here
+    return list(dict.fromkeys(find_mints(text)))
 
 async def handle_channel_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     msg = update.effective_message
@@ -835,847 +1829,488 @@ async def handle_channel_message(update: Update, context: ContextTypes.DEFAULT_T
         return
     chat = update.effective_chat
     
-    print(f"\n📨 Message Received:")
-    print(f"   💬 Chat Type: {chat.type}")
-    print(f"   👤 Username: {chat.username}")
-    print(f"   📝 Text: {msg.text[:200]}...")
-    print(f"   👤 User ID: {update.effective_user.id}")
+    # Channel posts carry no user. Private text is never logged: it may be a
+    # private key sent while the user is in US.WAITING_KEY
+    logger.info("📨 Message received: type=%s username=%s user_id=%s text=%.200s...",
+                chat.type, chat.username, update.effective_user.id if update.effective_user else None,
+                "<private>" if chat.type == "private" else msg.text)
     
     # Check if this is a channel message
     if chat.username and f"@{chat.username}" in CHANNELS:
-        # Print channel message info
-        print(f"\n📢 Channel Message:")
-        print(f"   📺 Channel: @{chat.username}")
-        print(f"   💬 Message: {msg.text[:200]}...")
-        print(f"   ⏰ Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 50)
+        logger.info("📢 Channel message: @%s: %.200s...", chat.username, msg.text)
         
-        for m in parse_signal(msg.text):
-            # fast-path: same as /buy
-            fake_update = update
-            await cmd_buy(fake_update, context)
+        # fast-path: same as /buy, one concurrent buy per mint
+        signals = parse_signal(msg.text)
+        if signals:
+            context.application.create_task(_buy_mints(signals, chat.id, context))
     elif chat.type == "supergroup":
         # Handle supergroup - check if it's our monitored group
-        print(f"\n📢 Supergroup Message:")
-        print(f"   📺 Chat ID: {chat.id}")
-        print(f"   💬 Message: {msg.text[:200]}...")
-        print(f"   ⏰ Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 50)
+        logger.info("📢 Supergroup message: %s: %.200s...", chat.id, msg.text)
         
         # Process all supergroup messages for now (you can add specific chat ID filtering later)
         signals = parse_signal(msg.text)
         if signals:
-            print(f"   🎯 Found {len(signals)} mint address(es): {signals}")
-            for m in signals:
-                print(f"   🚀 Auto-buying: {m}")
-                # Create fake context with mint address
-                fake_context = context
-                fake_context.args = [m]
-                await cmd_buy(update, fake_context)
+            logger.info("🎯 Found %s mint address(es), auto-buying: %s", len(signals), signals)
+            context.application.create_task(_buy_mints(signals, chat.id, context))
         else:
-            print(f"   ❌ No mint addresses found in message")
+            logger.info("❌ No mint addresses found in message")
     
     # Check if this is a private message from user waiting for private key
     elif chat.type == "private":  # Private chat
-        user_id = update.effective_user.id
-        print(f"   🔍 User State: {user_states.get(user_id, 'None')}")
+        state = context.user_data.get(USER_STATE_KEY, US.NONE)
+        logger.info("🔍 User state: %s", state.name)
         
-        if user_id in user_states and user_states[user_id] == "waiting_for_private_key":
-            print(f"   ✅ Handling private key input...")
+        if state is US.WAITING_KEY:
+            logger.info("✅ Handling private key input...")
             await handle_private_key_input(update, context)
         else:
-            print(f"   ❌ User not in waiting state, checking for token signals...")
+            logger.info("❌ User not in waiting state, checking for token signals...")
             # Regular private message - check for token signals
-            for m in parse_signal(msg.text):
-                fake_update = update
-                await cmd_buy(fake_update, context)
+            signals = parse_signal(msg.text)
+            if signals:
+                context.application.create_task(_buy_mints(signals, chat.id, context))
 
 async def handle_private_key_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle private key input from user"""
     user_id = update.effective_user.id
     private_key_str = update.effective_message.text.strip()
     
-    print(f"\n🔑 Private Key Input Received:")
-    print(f"   👤 User ID: {user_id}")
-    print(f"   🔑 Key: {private_key_str[:20]}...{private_key_str[-20:]}")
-    print(f"   📏 Length: {len(private_key_str)}")
+    # Never log key material, only its shape
+    logger.info("🔑 Private key input received: user_id=%s length=%s", user_id, len(private_key_str))
     
     # Clear user state
-    user_states.pop(user_id, None)
+    context.user_data.pop(USER_STATE_KEY, US.NONE)
     
     # Try to parse the private key
     private_key_bytes = parse_private_key(private_key_str)
-    print(f"   🔍 Parsed bytes length: {len(private_key_bytes) if private_key_bytes else 'None'}")
+    logger.info("🔍 Parsed bytes length: %s", len(private_key_bytes) if private_key_bytes else None)
     
     if private_key_bytes:
         # Generate wallet address from private key
         try:
-            # For Solana, the public key is derived from the first 32 bytes of the private key
-            if len(private_key_bytes) >= 32:
-                wallet_address = base58.b58encode(private_key_bytes[:32]).decode('utf-8')
-            else:
-                # If private key is shorter, pad it
-                padded_key = private_key_bytes + b'\x00' * (32 - len(private_key_bytes))
-                wallet_address = base58.b58encode(padded_key).decode('utf-8')
+            # The first 32 bytes are the Ed25519 seed; anything shorter can't sign
+            if len(private_key_bytes) < 32:
+                raise ValueError(f"key is {len(private_key_bytes)} bytes, expected at least 32")
+            # A mismatched keypair would sign for an account the swap doesn't name
+            if keypair_mismatch(private_key_bytes):
+                raise ValueError("public key half does not match the secret seed")
             
-            # Update global wallet private key
-            global WALLET_PRIVATE_KEY
-            WALLET_PRIVATE_KEY = private_key_str
-            
-            keyboard = [
-                [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            # Update global wallet private key; the public key is derived once there
+            load_wallet(private_key_str, private_key_bytes)
+            wallet_address = WALLET_PUBKEY_B58
             
             await update.message.reply_text(
-                f"✅ **Vessel Added Successfully!**\n\n"
-                f"**Wallet Address**: `{wallet_address[:8]}...{wallet_address[-8:]}`\n"
-                f"**Status**: 🟢 Connected\n"
-                f"**Private Key**: Valid format detected\n\n"
+                f"✅ <b>Vessel Added Successfully!</b>\n\n"
+                f"<b>Wallet Address</b>: <code>{wallet_address[:8]}...{wallet_address[-8:]}</code>\n"
+                f"<b>Status</b>: 🟢 Connected\n"
+                f"<b>Private Key</b>: Valid format detected\n\n"
                 f"The Leviathan now has access to this vessel for trading!",
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
+                reply_markup=BACK_TO_WALLET_DOCK_KB,
+                parse_mode='HTML'
             )
             
-            print(f"\n🔑 New Wallet Added:")
-            print(f"   👤 User: {update.effective_user.first_name}")
-            print(f"   🏦 Address: {wallet_address}")
-            print(f"   ⏰ Time: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print("=" * 50)
+            # The queued handler stamps the time and writes off the event loop
+            logger.info("🔑 New wallet added: user=%s address=%s", update.effective_user.first_name, wallet_address)
             
         except Exception as e:
-            keyboard = [
-                [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
             await update.message.reply_text(
-                f"❌ **Invalid Private Key Format**\n\n"
-                f"**Error**: {str(e)}\n\n"
-                f"**Supported Formats:**\n"
+                f"❌ <b>Invalid Private Key Format</b>\n\n"
+                f"<b>Error</b>: {html.escape(str(e))}\n\n"
+                f"<b>Supported Formats:</b>\n"
                 f"• Base58 (88 characters)\n"
                 f"• Hex string (64 characters)\n"
                 f"• JSON array format\n\n"
                 f"Please try again with a valid private key.",
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
+                reply_markup=BACK_TO_WALLET_DOCK_KB,
+                parse_mode='HTML'
             )
     else:
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await update.message.reply_text(
-            f"❌ **Invalid Private Key**\n\n"
-            f"**Error**: Could not parse private key\n\n"
-            f"**Supported Formats:**\n"
+            f"❌ <b>Invalid Private Key</b>\n\n"
+            f"<b>Error</b>: Could not parse private key\n\n"
+            f"<b>Supported Formats:</b>\n"
             f"• Base58 (88 characters)\n"
             f"• Hex string (64 characters)\n"
             f"• JSON array format\n\n"
             f"Please try again with a valid private key.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
+            reply_markup=BACK_TO_WALLET_DOCK_KB,
+            parse_mode='HTML'
         )
 
 # ================== INLINE KEYBOARD HANDLERS ==================
+# (chat_id, message_id) -> (text hash, markup identity) of what the message shows now
+_last_render: Dict[Tuple[int, int], Tuple[int, int]] = {}
+LAST_RENDER_MAX = 4096
+
+async def safe_edit(query, text: str, reply_markup=None, parse_mode=None):
+    """Edit a menu message unless it already shows this text and keyboard"""
+    message = query.message
+    key = (message.chat_id, message.message_id)
+    # Static keyboards are shared constants, so identity is enough to spot a re-render
+    render = (hash(text), id(reply_markup))
+    if _last_render.get(key) == render:
+        return
+    if len(_last_render) >= LAST_RENDER_MAX:
+        _last_render.clear()
+    _last_render[key] = render
+    try:
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+    except BadRequest as e:
+        # Same content rendered before a restart; anything else is a real failure
+        if "not modified" not in str(e).lower():
+            _last_render.pop(key, None)
+            raise
+    except Exception:
+        _last_render.pop(key, None)
+        raise
+
+# Setting taps can arrive in bursts on one message; within the window only the
+# last edit is sent, the earlier ones are dropped before reaching Telegram
+EDIT_DEBOUNCE_SECONDS = 0.05
+_pending_edits: Dict[Tuple[int, int], asyncio.Task] = {}   # still inside the window
+_sending_edits: Dict[Tuple[int, int], asyncio.Task] = {}   # last edit past the window
+
+async def _debounced_edit(key, query, text, reply_markup, parse_mode):
+    await asyncio.sleep(EDIT_DEBOUNCE_SECONDS)
+    me = asyncio.current_task()
+    # Past the window: no longer cancellable, it is sent after the edit already in
+    # flight for this message so the last tap is always what the message ends up showing
+    if _pending_edits.get(key) is me:
+        del _pending_edits[key]
+    previous = _sending_edits.get(key)
+    _sending_edits[key] = me
+    try:
+        if previous is not None:
+            await asyncio.wait((previous,))
+        await safe_edit(query, text, reply_markup=reply_markup, parse_mode=parse_mode)
+    finally:
+        if _sending_edits.get(key) is me:
+            del _sending_edits[key]
+
+async def queue_edit(query, text: str, reply_markup=None, parse_mode=None):
+    """safe_edit, coalesced with other edits to the same message inside the debounce window"""
+    message = query.message
+    key = (message.chat_id, message.message_id)
+    pending = _pending_edits.get(key)
+    if pending is not None:
+        pending.cancel()
+    task = _pending_edits[key] = asyncio.create_task(
+        _debounced_edit(key, query, text, reply_markup, parse_mode))
+    await asyncio.wait((task,))
+    # A superseded edit returns quietly; a failed one raises like safe_edit
+    if not task.cancelled():
+        task.result()
+
+def ack_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Ack in the background so the menu edit isn't queued behind a Telegram round-trip;
+    # the application keeps a reference to the task and logs any failure
+    context.application.create_task(update.callback_query.answer(), update=update)
+
 async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Exact-match buttons; registered with a CALLBACK_HANDLERS membership pattern"""
+    ack_callback(update, context)
     query = update.callback_query
-    await query.answer()
-    
-    if query.data == "wallet_dock":
-        await show_wallet_dock(query)
-    elif query.data == "trade_settings":
-        await show_trade_settings(query)
-    elif query.data == "leviathan_mode":
-        await show_leviathan_mode(query)
-    elif query.data == "sniping_grounds":
-        await show_sniping_grounds(query)
-    elif query.data == "navigation_logs":
-        await show_navigation_logs(query)
-    elif query.data == "leviathan_forge":
-        await show_leviathan_forge(query)
-    elif query.data == "back_to_main":
-        await show_main_menu(query)
-    
-    # Wallet Dock Actions
-    elif query.data == "add_wallet":
-        await add_wallet_action(query)
-    elif query.data == "view_fleet":
-        await view_fleet_action(query)
-    elif query.data == "remove_wallet":
-        await remove_wallet_action(query)
-    elif query.data == "confirm_remove":
-        await confirm_remove_action(query)
-    
-    # Trade Settings Actions
-    elif query.data == "set_percentage":
-        await set_percentage_action(query)
-    elif query.data == "set_fixed":
-        await set_fixed_action(query)
-    elif query.data == "check_settings":
-        await check_settings_action(query)
-    
-    # Leviathan Mode Actions
-    elif query.data == "awaken_beast":
-        await awaken_beast_action(query)
-    elif query.data == "sleep_beast":
-        await sleep_beast_action(query)
-    elif query.data == "beast_status":
-        await beast_status_action(query)
-    
-    # Sniping Grounds Actions
-    elif query.data == "add_channel":
-        await add_channel_action(query)
-    elif query.data == "view_channels":
-        await view_channels_action(query)
-    elif query.data == "remove_channel":
-        await remove_channel_action(query)
-    
-    # Navigation & Logs Actions
-    elif query.data == "battle_history":
-        await battle_history_action(query)
-    elif query.data == "war_chest":
-        await war_chest_action(query)
-    elif query.data == "notifications":
-        await notifications_action(query)
-    
-    # Leviathan Forge Actions
-    elif query.data == "adjust_stops":
-        await adjust_stops_action(query)
-    elif query.data == "ladder_strategy":
-        await ladder_strategy_action(query)
-    elif query.data == "reentry_tide":
-        await reentry_tide_action(query)
-    
-    # Percentage Selection
-    elif query.data.startswith("set_pct_"):
-        percentage = float(query.data.split("_")[2])
-        await set_percentage_value(query, percentage)
-    
-    # Fixed Amount Selection
-    elif query.data.startswith("set_fixed_"):
-        amount = float(query.data.split("_")[2])
-        await set_fixed_value(query, amount)
-    
-    # Channel Management
-    elif query.data.startswith("remove_ch_"):
-        channel = query.data.split("_", 2)[2]
-        await remove_specific_channel(query, channel)
-
-async def show_wallet_dock(query):
-    keyboard = [
-        [InlineKeyboardButton("➕ Add Vessel", callback_data="add_wallet")],
-        [InlineKeyboardButton("👁️ View Fleet", callback_data="view_fleet")],
-        [InlineKeyboardButton("🗑️ Remove Vessel", callback_data="remove_wallet")],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "⚓ **Wallet Dock**\n\n"
-        "Manage your connected wallets and vessel fleet.\n\n"
-        "• **Add Vessel**: Connect a new wallet to the Leviathan\n"
-        "• **View Fleet**: See all connected wallets and balances\n"
-        "• **Remove Vessel**: Disconnect a wallet from the fleet",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+    await CALLBACK_HANDLERS[query.data](query)
 
-async def show_trade_settings(query):
-    keyboard = [
-        [InlineKeyboardButton("📊 Set Tribute %", callback_data="set_percentage")],
-        [InlineKeyboardButton("💰 Set Fixed Strike", callback_data="set_fixed")],
-        [InlineKeyboardButton("🔍 Check Current Loadout", callback_data="check_settings")],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "⚔️ **Trade Settings**\n\n"
-        "Configure your trading strategy and strike patterns.\n\n"
-        "• **Set Tribute %**: Choose % of wallet balance per trade (5%, 10%, 20%)\n"
-        "• **Set Fixed Strike**: Choose fixed trade sizes ($10, $20, $50, etc.)\n"
-        "• **Check Current Loadout**: View active trade settings",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+async def render_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Static menus; registered with a MENUS membership pattern"""
+    ack_callback(update, context)
+    query = update.callback_query
+    text, reply_markup = MENUS[query.data]
+    await safe_edit(query, text, reply_markup=reply_markup, parse_mode='HTML')
 
-async def show_leviathan_mode(query):
-    status = "🌊 AWAKE" if not DRY_RUN else "😴 SLEEPING"
-    keyboard = [
-        [InlineKeyboardButton("🌊 Awaken Beast", callback_data="awaken_beast")],
-        [InlineKeyboardButton("😴 Send to Depths", callback_data="sleep_beast")],
-        [InlineKeyboardButton("📊 Status of the Beast", callback_data="beast_status")],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"🌊 **Leviathan Mode**\n\n"
-        f"Control the beast's trading state.\n\n"
-        f"**Current Status**: {status}\n\n"
-        "• **Awaken Beast**: Turn bot ON (auto-trading active)\n"
-        "• **Send to Depths**: Turn bot OFF (pause trading)\n"
-        "• **Status of the Beast**: Show if bot is currently trading or sleeping",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+async def handle_prefixed_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Parameterised buttons; CALLBACK_PREFIX_RE splits the data into prefix and value"""
+    ack_callback(update, context)
+    prefix, value = context.matches[0].groups()
+    await CALLBACK_PREFIXES[prefix](update.callback_query, value)
 
-async def show_sniping_grounds(query):
-    keyboard = [
-        [InlineKeyboardButton("📍 Mark New Waters", callback_data="add_channel")],
-        [InlineKeyboardButton("👁️ Survey the Waters", callback_data="view_channels")],
-        [InlineKeyboardButton("🗑️ Abandon Waters", callback_data="remove_channel")],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "🪝 **Sniping Grounds**\n\n"
-        "Manage your hunting grounds and signal sources.\n\n"
-        "• **Mark New Waters**: Add Telegram groups to scan/snipe\n"
-        "• **Survey the Waters**: Show current groups monitored\n"
-        "• **Abandon Waters**: Remove groups from monitoring",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+def listed_option(value: str, options) -> Optional[float]:
+    """Button value as a number, or None unless it is one of the offered options"""
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if number in options else None
 
-async def show_navigation_logs(query):
-    keyboard = [
-        [InlineKeyboardButton("📜 Battle History", callback_data="battle_history")],
-        [InlineKeyboardButton("💰 War Chest", callback_data="war_chest")],
-        [InlineKeyboardButton("🔔 Signals & Whispers", callback_data="notifications")],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "📜 **Navigation & Logs**\n\n"
-        "Track your conquests and manage notifications.\n\n"
-        "• **Battle History**: Show recent trades (PnL logs)\n"
-        "• **War Chest**: Show current profits/losses\n"
-        "• **Signals & Whispers**: Notifications / alerts toggle",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+async def set_pct_callback(query, value: str):
+    percentage = listed_option(value, PCT_OPTIONS)
+    if percentage is None:
+        logger.warning("⚠️ Ignoring unlisted percentage callback: %s", value)
+        return
+    await set_percentage_value(query, percentage)
 
-async def show_leviathan_forge(query):
-    keyboard = [
-        [InlineKeyboardButton("🛡️ Adjust Trail & Stop", callback_data="adjust_stops")],
-        [InlineKeyboardButton("📈 Ladder Strategy", callback_data="ladder_strategy")],
-        [InlineKeyboardButton("♻️ Re-Entry Tide", callback_data="reentry_tide")],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "⚙️ **Leviathan Forge**\n\n"
-        "Fine-tune your trading parameters and strategies.\n\n"
-        "• **Adjust Trail & Stop**: Edit trailing stop %, stop loss %\n"
-        "• **Ladder Strategy**: Adjust scaling buy levels (2x, 4x, 10x)\n"
-        "• **Re-Entry Tide**: Toggle re-entry strategy on/off",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+async def set_fixed_callback(query, value: str):
+    amount = listed_option(value, FIXED_OPTIONS)
+    if amount is None:
+        logger.warning("⚠️ Ignoring unlisted fixed amount callback: %s", value)
+        return
+    await set_fixed_value(query, amount)
+
+async def handle_add_wallet_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Needs the per-user state store, so it is routed outside CALLBACK_HANDLERS
+    ack_callback(update, context)
+    await add_wallet_action(update.callback_query, context.user_data)
+
+async def handle_stale_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Buttons from an older build still need an answer or their spinner never stops
+    ack_callback(update, context)
+
+async def show_leviathan_mode(query):
+    status = "🌊 AWAKE" if not DRY_RUN else "😴 SLEEPING"
+    await safe_edit(query,
+        LEVIATHAN_MODE_TEMPLATE.format_map({"status": status}),
+        reply_markup=LEVIATHAN_MODE_KB,
+        parse_mode='HTML'
     )
 
 async def show_main_menu(query):
-    # Get current trade amount info
-    trade_amount = await calculate_trade_amount()
-    trading_mode = f"{TRADE_PERCENTAGE}% of wallet" if USE_PERCENTAGE_TRADING else f"${TRADE_AMOUNT_USD} fixed"
-    
-    # Create main menu
-    keyboard = [
-        [InlineKeyboardButton("⚓ Wallet Dock", callback_data="wallet_dock")],
-        [InlineKeyboardButton("⚔️ Trade Settings", callback_data="trade_settings")],
-        [InlineKeyboardButton("🌊 Leviathan Mode", callback_data="leviathan_mode")],
-        [InlineKeyboardButton("🪝 Sniping Grounds", callback_data="sniping_grounds")],
-        [InlineKeyboardButton("📜 Navigation & Logs", callback_data="navigation_logs")],
-        [InlineKeyboardButton("⚙️ Leviathan Forge", callback_data="leviathan_forge")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"🌊 Welcome to Leviathan86Bot 🐉\n\n"
-        f"From the depths of the crypto seas, the Leviathan rises.\n"
-        f"An unstoppable force, carving through the tides of meme coins and alt markets alike.\n\n"
-        f"With your wallets as its vessel, Leviathan86Bot hunts, trades, and strikes automatically — seizing opportunity before it slips beneath the waves.\n\n"
-        f"Brace yourself. Once awakened, the Leviathan doesn't ask. It takes.\n\n"
-        f"⚡️ Connect your wallet. Unleash the beast. Rule the crypton seas.\n\n"
-        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-        f"🤖 Bot Status: {'LIVE TRADING' if not DRY_RUN else 'DRY RUN MODE'}\n"
-        f"💰 Trading: {trading_mode} (${trade_amount:.2f})\n"
-        f"🛡️ SL: {STOP_LOSS_PCT}% | Trail: {TRAIL_FROM_PEAK_PCT}% | Ladder: 2x:30%,5x:20%,10x:10%,15x:15%,20x:15%\n"
-        f"♻️ Re-entry: {'Enabled' if REENTRY_ENABLED else 'Disabled'} (Buyer preference)\n"
-        f"👀 Watching: {', '.join(CHANNELS)}",
-        reply_markup=reply_markup
+    await safe_edit(query,
+        await main_menu_text(),
+        reply_markup=MAIN_MENU_KB
     )
 
 # ================== ACTION FUNCTIONS ==================
-async def add_wallet_action(query):
+async def add_wallet_action(query, user_data: dict):
     # Set user state to waiting for private key
-    user_id = query.from_user.id
-    user_states[user_id] = "waiting_for_private_key"
-    
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    user_data[USER_STATE_KEY] = US.WAITING_KEY
     
-    await query.edit_message_text(
-        "➕ **Add Vessel**\n\n"
-        "To add a new wallet to the Leviathan fleet:\n\n"
-        "1. Send your wallet private key as a message\n"
-        "2. Format: `YOUR_PRIVATE_KEY` (base58, hex, or JSON array)\n"
-        "3. The wallet will be added to the fleet\n\n"
-        "⚠️ **Security Note**: Only send private keys in private chat!\n\n"
-        "**Status**: ⏳ Waiting for private key...",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        ADD_WALLET_TEXT,
+        reply_markup=BACK_TO_WALLET_DOCK_KB,
+        parse_mode='HTML'
     )
 
 async def view_fleet_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     # Check if wallet is connected
     if not WALLET_PRIVATE_KEY or WALLET_PRIVATE_KEY.strip() == "":
-        await query.edit_message_text(
-            f"👁️ **View Fleet**\n\n"
-            f"**Active Vessels:**\n"
-            f"• No vessels connected\n\n"
-            f"**Fleet Summary:**\n"
-            f"• Total Vessels: 0\n"
-            f"• Total Balance: $0.00 USD\n"
-            f"• Ready for Trading: ❌\n\n"
-            f"**Status:** Fleet is empty. Add a vessel to begin trading.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
+        await safe_edit(query,
+            FLEET_EMPTY_TEXT,
+            reply_markup=BACK_TO_WALLET_DOCK_KB,
+            parse_mode='HTML'
         )
         return
     
-    # Get wallet balance
-    try:
-        balance_usd = await get_wallet_balance_usd()
-        private_key = parse_private_key(WALLET_PRIVATE_KEY)
-        wallet_pubkey = base58.b58encode(private_key).decode() if private_key else "Unknown"
-    except:
-        balance_usd = 0.0
-        wallet_pubkey = "Unknown"
-    
-    await query.edit_message_text(
-        f"👁️ **View Fleet**\n\n"
-        f"**Active Vessels:**\n"
-        f"• **Vessel 1**: `{wallet_pubkey[:8]}...{wallet_pubkey[-8:]}`\n"
-        f"  💰 Balance: ${balance_usd:.2f} USD\n"
-        f"  🟢 Status: Connected\n\n"
-        f"**Fleet Summary:**\n"
-        f"• Total Vessels: 1\n"
-        f"• Total Balance: ${balance_usd:.2f} USD\n"
-        f"• Ready for Trading: ✅",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    # Get wallet balance; the address was derived once in load_wallet
+    wallet_pubkey = WALLET_PUBKEY_B58 or "Unknown"
+    balance_usd = await menu_balance_usd()
+    
+    await safe_edit(query,
+        VIEW_FLEET_TEMPLATE.format_map({
+            "address_head": wallet_pubkey[:8],
+            "address_tail": wallet_pubkey[-8:],
+            "balance_usd": balance_usd,
+        }),
+        reply_markup=BACK_TO_WALLET_DOCK_KB,
+        parse_mode='HTML'
     )
 
 async def remove_wallet_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🗑️ Confirm Remove", callback_data="confirm_remove")],
-        [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "🗑️ **Remove Vessel**\n\n"
-        "⚠️ **Warning**: This will disconnect the wallet from the Leviathan fleet.\n\n"
-        "**Current Wallet:**\n"
-        f"• Address: `{base58.b58encode(parse_private_key(WALLET_PRIVATE_KEY)).decode()[:8] if parse_private_key(WALLET_PRIVATE_KEY) else 'Unknown'}...`\n"
+    await safe_edit(query,
+        "🗑️ <b>Remove Vessel</b>\n\n"
+        "⚠️ <b>Warning</b>: This will disconnect the wallet from the Leviathan fleet.\n\n"
+        "<b>Current Wallet:</b>\n"
+        f"• Address: <code>{WALLET_PUBKEY_B58[:8] or 'Unknown'}...</code>\n"
         f"• Status: Connected\n\n"
         "Are you sure you want to remove this vessel?",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+        reply_markup=REMOVE_WALLET_KB,
+        parse_mode='HTML'
     )
 
 async def confirm_remove_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Wallet Dock", callback_data="wallet_dock")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    # Clear the wallet private key (reset to empty)
-    global WALLET_PRIVATE_KEY
-    WALLET_PRIVATE_KEY = ""
-    
-    await query.edit_message_text(
-        "✅ **Vessel Removed Successfully**\n\n"
-        "The wallet has been disconnected from the Leviathan fleet.\n\n"
-        "**Status:**\n"
-        "• Wallet: Disconnected\n"
-        "• Trading: Paused\n"
-        "• Fleet Status: Empty\n\n"
-        "To resume trading, add a new vessel using 'Add Vessel'.",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
-
-async def set_percentage_action(query):
-    keyboard = [
-        [InlineKeyboardButton("5%", callback_data="set_pct_5.0")],
-        [InlineKeyboardButton("10%", callback_data="set_pct_10.0")],
-        [InlineKeyboardButton("15%", callback_data="set_pct_15.0")],
-        [InlineKeyboardButton("20%", callback_data="set_pct_20.0")],
-        [InlineKeyboardButton("25%", callback_data="set_pct_25.0")],
-        [InlineKeyboardButton("🔙 Back to Trade Settings", callback_data="trade_settings")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "📊 **Set Tribute %**\n\n"
-        "Choose the percentage of wallet balance to use per trade:\n\n"
-        "**Current Setting:** 5% of wallet balance\n\n"
-        "Select a new percentage:",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
-
-async def set_fixed_action(query):
-    keyboard = [
-        [InlineKeyboardButton("$10", callback_data="set_fixed_10")],
-        [InlineKeyboardButton("$20", callback_data="set_fixed_20")],
-        [InlineKeyboardButton("$50", callback_data="set_fixed_50")],
-        [InlineKeyboardButton("$100", callback_data="set_fixed_100")],
-        [InlineKeyboardButton("$200", callback_data="set_fixed_200")],
-        [InlineKeyboardButton("$500", callback_data="set_fixed_500")],
-        [InlineKeyboardButton("🔙 Back to Trade Settings", callback_data="trade_settings")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # Clear the wallet private key and its derived address together (reset to empty)
+    load_wallet("")
     
-    await query.edit_message_text(
-        "💰 **Set Fixed Strike**\n\n"
-        "Choose a fixed dollar amount per trade:\n\n"
-        "**Current Setting:** 5% of wallet (Dynamic)\n\n"
-        "Select a fixed amount:",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        WALLET_REMOVED_TEXT,
+        reply_markup=BACK_TO_WALLET_DOCK_KB,
+        parse_mode='HTML'
     )
 
 async def check_settings_action(query):
     trade_amount = await calculate_trade_amount()
     trading_mode = f"{TRADE_PERCENTAGE}% of wallet" if USE_PERCENTAGE_TRADING else f"${TRADE_AMOUNT_USD} fixed"
     
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Trade Settings", callback_data="trade_settings")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"🔍 **Check Current Loadout**\n\n"
-        f"**Trading Configuration:**\n"
-        f"• **Mode**: {trading_mode}\n"
-        f"• **Amount**: ${trade_amount:.2f}\n"
-        f"• **Stop Loss**: {STOP_LOSS_PCT}%\n"
-        f"• **Trailing Stop**: {TRAIL_FROM_PEAK_PCT}%\n"
-        f"• **Take Profit Ladder**: {TP_LADDER}\n"
-        f"• **Re-entry**: {'Enabled' if REENTRY_ENABLED else 'Disabled'}\n"
-        f"• **Max Re-entries**: {MAX_REENTRIES_PER_TOKEN}\n"
-        f"• **Re-entry Confirm**: +{REENTRY_CONFIRM_PCT}%\n\n"
-        f"**Current Status:**\n"
-        f"• Bot Mode: {'LIVE TRADING' if not DRY_RUN else 'DRY RUN'}\n"
-        f"• Channels: {len(CHANNELS)} monitored",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        CHECK_SETTINGS_TEMPLATE.format_map({
+            **MENU_CONFIG,
+            "trading_mode": trading_mode,
+            "trade_amount": trade_amount,
+            "bot_mode": "LIVE TRADING" if not DRY_RUN else "DRY RUN",
+            "channel_count": len(CHANNELS),
+        }),
+        reply_markup=BACK_TO_TRADE_SETTINGS_KB,
+        parse_mode='HTML'
     )
 
 async def awaken_beast_action(query):
     global DRY_RUN
     DRY_RUN = False
     
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Leviathan Mode", callback_data="leviathan_mode")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "🌊 **Beast Awakened!**\n\n"
-        "The Leviathan has risen from the depths!\n\n"
-        "✅ **Status**: LIVE TRADING ACTIVE\n"
-        "⚡ **Auto-trading**: ENABLED\n"
-        "🎯 **Target**: @gem_tools_calls\n"
-        "💰 **Strike Force**: 5% of wallet\n\n"
-        "The beast hunts...",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        BEAST_AWAKENED_TEXT,
+        reply_markup=BACK_TO_LEVIATHAN_MODE_KB,
+        parse_mode='HTML'
     )
 
 async def sleep_beast_action(query):
     global DRY_RUN
     DRY_RUN = True
     
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Leviathan Mode", callback_data="leviathan_mode")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "😴 **Beast Sent to Depths**\n\n"
-        "The Leviathan has returned to slumber.\n\n"
-        "⏸️ **Status**: TRADING PAUSED\n"
-        "💤 **Auto-trading**: DISABLED\n"
-        "👁️ **Monitoring**: Still watching channels\n"
-        "🛡️ **Protection**: All positions safe\n\n"
-        "The beast sleeps...",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        BEAST_SLEEPING_TEXT,
+        reply_markup=BACK_TO_LEVIATHAN_MODE_KB,
+        parse_mode='HTML'
     )
 
 async def beast_status_action(query):
     status = "🌊 AWAKE" if not DRY_RUN else "😴 SLEEPING"
     mode = "LIVE TRADING" if not DRY_RUN else "DRY RUN MODE"
     
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Leviathan Mode", callback_data="leviathan_mode")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"📊 **Status of the Beast**\n\n"
-        f"**Current State**: {status}\n"
-        f"**Trading Mode**: {mode}\n"
-        f"**Auto-trading**: {'ACTIVE' if not DRY_RUN else 'PAUSED'}\n"
-        f"**Channels Monitored**: {len(CHANNELS)}\n"
-        f"**Last Activity**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        f"**Fleet Status:**\n"
-        f"• Wallets Connected: 1\n"
-        f"• Ready for Action: {'✅' if not DRY_RUN else '⏸️'}\n"
-        f"• Monitoring: @gem_tools_calls",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        BEAST_STATUS_TEMPLATE.format_map({
+            "status": status,
+            "mode": mode,
+            "auto_trading": "ACTIVE" if not DRY_RUN else "PAUSED",
+            "channel_count": len(CHANNELS),
+            "last_activity": format_clock(int(time.time())),
+            "ready": "✅" if not DRY_RUN else "⏸️",
+        }),
+        reply_markup=BACK_TO_LEVIATHAN_MODE_KB,
+        parse_mode='HTML'
     )
 
 async def add_channel_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Sniping Grounds", callback_data="sniping_grounds")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "📍 **Mark New Waters**\n\n"
+    await safe_edit(query,
+        "📍 <b>Mark New Waters</b>\n\n"
         "To add a new Telegram channel for monitoring:\n\n"
         "1. Send the channel username as a message\n"
-        "2. Format: `@channel_username`\n"
+        "2. Format: <code>@channel_username</code>\n"
         "3. The channel will be added to monitoring\n\n"
-        "**Current Channels:**\n"
-        f"• {', '.join(CHANNELS)}\n\n"
-        "**Note**: Bot must be admin in the channel to monitor messages.",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+        "<b>Current Channels:</b>\n"
+        f"• {_channels_joined}\n\n"
+        "<b>Note</b>: Bot must be admin in the channel to monitor messages.",
+        reply_markup=BACK_TO_SNIPING_GROUNDS_KB,
+        parse_mode='HTML'
     )
 
 async def view_channels_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Sniping Grounds", callback_data="sniping_grounds")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"👁️ **Survey the Waters**\n\n"
-        f"**Currently Monitoring:**\n"
-        f"• {', '.join(CHANNELS)}\n\n"
-        f"**Total Channels**: {len(CHANNELS)}\n"
-        f"**Status**: {'🟢 Active' if len(CHANNELS) > 0 else '🔴 No channels'}\n\n"
-        f"**Monitoring Features:**\n"
+    await safe_edit(query,
+        f"👁️ <b>Survey the Waters</b>\n\n"
+        f"<b>Currently Monitoring:</b>\n"
+        f"• {_channels_joined}\n\n"
+        f"<b>Total Channels</b>: {len(CHANNELS)}\n"
+        f"<b>Status</b>: {'🟢 Active' if len(CHANNELS) > 0 else '🔴 No channels'}\n\n"
+        f"<b>Monitoring Features:</b>\n"
         f"• Auto-detect launch signals\n"
         f"• Instant trade execution\n"
         f"• Real-time price tracking\n"
         f"• Risk management active",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+        reply_markup=BACK_TO_SNIPING_GROUNDS_KB,
+        parse_mode='HTML'
     )
 
 async def remove_channel_action(query):
     if len(CHANNELS) <= 1:
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to Sniping Grounds", callback_data="sniping_grounds")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(
-            "🗑️ **Abandon Waters**\n\n"
-            "⚠️ **Cannot remove all channels!**\n\n"
+        await safe_edit(query,
+            "🗑️ <b>Abandon Waters</b>\n\n"
+            "⚠️ <b>Cannot remove all channels!</b>\n\n"
             "You must have at least one channel for monitoring.\n"
             "Add a new channel before removing this one.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
+            reply_markup=BACK_TO_SNIPING_GROUNDS_KB,
+            parse_mode='HTML'
         )
     else:
-        keyboard = []
-        for channel in CHANNELS:
-            keyboard.append([InlineKeyboardButton(f"🗑️ Remove {channel}", callback_data=f"remove_ch_{channel}")])
-        keyboard.append([InlineKeyboardButton("🔙 Back to Sniping Grounds", callback_data="sniping_grounds")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(
-            "🗑️ **Abandon Waters**\n\n"
+        text, reply_markup = remove_channel_view()
+        await safe_edit(query, text, reply_markup=reply_markup, parse_mode='HTML')
+
+def remove_channel_view():
+    """Abandon Waters body and keyboard; rebuilt only after CHANNELS changes"""
+    global _remove_channel_view
+    if _remove_channel_view is None:
+        text = (
+            "🗑️ <b>Abandon Waters</b>\n\n"
             "Select a channel to remove from monitoring:\n\n"
-            "**Current Channels:**\n" + "\n".join([f"• {ch}" for ch in CHANNELS]),
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
+            "<b>Current Channels:</b>\n" + "\n".join([f"• {ch}" for ch in CHANNELS])
         )
-
-async def battle_history_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Navigation & Logs", callback_data="navigation_logs")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        "📜 **Battle History**\n\n"
-        "**Recent Trades:**\n"
-        "• No trades executed yet\n\n"
-        "**Trading Statistics:**\n"
-        "• Total Trades: 0\n"
-        "• Successful Trades: 0\n"
-        "• Failed Trades: 0\n"
-        "• Win Rate: N/A\n\n"
-        "**Last 24 Hours:**\n"
-        "• Trades: 0\n"
-        "• Volume: $0.00\n"
-        "• PnL: $0.00",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
+        reply_markup = InlineKeyboardMarkup(
+            [[InlineKeyboardButton(f"🗑️ Remove {ch}", callback_data=f"remove_ch_{ch}")] for ch in CHANNELS]
+            + [[BACK_SNIPING_GROUNDS_BTN]]
+        )
+        _remove_channel_view = (text, reply_markup)
+    return _remove_channel_view
 
 async def war_chest_action(query):
-    try:
-        balance_usd = await get_wallet_balance_usd()
-    except:
-        balance_usd = 0.0
-    
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Navigation & Logs", callback_data="navigation_logs")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"💰 **War Chest**\n\n"
-        f"**Current Holdings:**\n"
-        f"• SOL Balance: ${balance_usd:.2f} USD\n"
-        f"• Available for Trading: ${balance_usd * 0.05:.2f} (5%)\n\n"
-        f"**Trading Performance:**\n"
-        f"• Total PnL: $0.00\n"
-        f"• Daily PnL: $0.00\n"
-        f"• Best Trade: N/A\n"
-        f"• Worst Trade: N/A\n\n"
-        f"**Risk Management:**\n"
-        f"• Stop Loss: {STOP_LOSS_PCT}%\n"
-        f"• Trailing Stop: {TRAIL_FROM_PEAK_PCT}%\n"
-        f"• Max Risk per Trade: 5%",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
-    )
-
-async def notifications_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Navigation & Logs", callback_data="navigation_logs")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    balance_usd = await menu_balance_usd()
     
-    await query.edit_message_text(
-        "🔔 **Signals & Whispers**\n\n"
-        "**Notification Settings:**\n"
-        "• Trade Executions: ✅ Enabled\n"
-        "• Price Alerts: ✅ Enabled\n"
-        "• Error Notifications: ✅ Enabled\n"
-        "• Channel Signals: ✅ Enabled\n\n"
-        "**Alert Types:**\n"
-        "• Buy/Sell Confirmations\n"
-        "• Stop Loss Triggers\n"
-        "• Take Profit Hits\n"
-        "• Re-entry Alerts\n"
-        "• System Errors\n\n"
-        "All notifications are sent to this chat.",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await safe_edit(query,
+        WAR_CHEST_TEMPLATE.format_map({**MENU_CONFIG, "balance_usd": balance_usd, "available_usd": balance_usd * 0.05}),
+        reply_markup=BACK_TO_NAVIGATION_LOGS_KB,
+        parse_mode='HTML'
     )
 
 async def adjust_stops_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Leviathan Forge", callback_data="leviathan_forge")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"🛡️ **Adjust Trail & Stop**\n\n"
-        f"**Current Settings:**\n"
+    await safe_edit(query,
+        f"🛡️ <b>Adjust Trail &amp; Stop</b>\n\n"
+        f"<b>Current Settings:</b>\n"
         f"• Stop Loss: {STOP_LOSS_PCT}%\n"
         f"• Trailing Stop: {TRAIL_FROM_PEAK_PCT}%\n\n"
-        f"**To modify these settings:**\n"
+        f"<b>To modify these settings:</b>\n"
         f"1. Edit the values in bot.py\n"
         f"2. Restart the bot\n\n"
-        f"**Recommended Values:**\n"
+        f"<b>Recommended Values:</b>\n"
         f"• Stop Loss: 10-20%\n"
         f"• Trailing Stop: 5-15%\n\n"
-        f"**Current Configuration:**\n"
+        f"<b>Current Configuration:</b>\n"
         f"• STOP_LOSS_PCT = {STOP_LOSS_PCT}\n"
         f"• TRAIL_FROM_PEAK_PCT = {TRAIL_FROM_PEAK_PCT}",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+        reply_markup=BACK_TO_LEVIATHAN_FORGE_KB,
+        parse_mode='HTML'
     )
 
 async def ladder_strategy_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Leviathan Forge", callback_data="leviathan_forge")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"📈 **Ladder Strategy**\n\n"
-        f"**Current Take Profit Ladder:**\n"
+    await safe_edit(query,
+        f"📈 <b>Ladder Strategy</b>\n\n"
+        f"<b>Current Take Profit Ladder:</b>\n"
         f"• {TP_LADDER}\n\n"
-        f"**How it works:**\n"
+        f"<b>How it works:</b>\n"
         f"• Sells portions at different profit levels\n"
         f"• Reduces risk while maximizing gains\n"
-        f"• **New Format**: 30% at 2x, 20% at 5x, 10% at 10x, 15% at 15x, 15% at 20x\n\n"
-        f"**Profit Distribution:**\n"
+        f"• <b>New Format</b>: 30% at 2x, 20% at 5x, 10% at 10x, 15% at 15x, 15% at 20x\n\n"
+        f"<b>Profit Distribution:</b>\n"
         f"• 2x: 30% of position\n"
         f"• 5x: 20% of position\n"
         f"• 10x: 10% of position\n"
         f"• 15x: 15% of position\n"
         f"• 20x: 15% of position\n"
         f"• Rest: Trailing stop\n\n"
-        f"**To modify:**\n"
+        f"<b>To modify:</b>\n"
         f"1. Edit TP_LADDER in .env file\n"
         f"2. Restart the bot\n\n"
-        f"**Current Setting:**\n"
+        f"<b>Current Setting:</b>\n"
         f"TP_LADDER = {TP_LADDER}",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+        reply_markup=BACK_TO_LEVIATHAN_FORGE_KB,
+        parse_mode='HTML'
     )
 
 async def reentry_tide_action(query):
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Leviathan Forge", callback_data="leviathan_forge")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"♻️ **Re-Entry Tide**\n\n"
-        f"**Current Settings:**\n"
+    await safe_edit(query,
+        f"♻️ <b>Re-Entry Tide</b>\n\n"
+        f"<b>Current Settings:</b>\n"
         f"• Re-entry: {'Enabled' if REENTRY_ENABLED else 'Disabled'}\n"
         f"• Max Re-entries: {MAX_REENTRIES_PER_TOKEN}\n"
         f"• Confirm Threshold: +{REENTRY_CONFIRM_PCT}%\n\n"
-        f"**Status**: Re-entry is **DISABLED** as per buyer's preference\n\n"
-        f"**Why Disabled:**\n"
+        f"<b>Status</b>: Re-entry is <b>DISABLED</b> as per buyer's preference\n\n"
+        f"<b>Why Disabled:</b>\n"
         f"• Buyer prefers no re-entry strategy\n"
         f"• Focus on single entry with ladder strategy\n"
         f"• Reduces complexity and risk\n\n"
-        f"**Current Configuration:**\n"
+        f"<b>Current Configuration:</b>\n"
         f"• REENTRY_ENABLED = {REENTRY_ENABLED}\n"
         f"• Strategy: Single entry with advanced ladder\n"
         f"• Last 10%: 15% trailing stop from peak",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+        reply_markup=BACK_TO_LEVIATHAN_FORGE_KB,
+        parse_mode='HTML'
     )
 
 # Additional helper functions
@@ -1684,18 +2319,10 @@ async def set_percentage_value(query, percentage):
     TRADE_PERCENTAGE = percentage
     USE_PERCENTAGE_TRADING = True
     
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Trade Settings", callback_data="trade_settings")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"✅ **Tribute % Updated!**\n\n"
-        f"**New Setting**: {percentage}% of wallet balance\n"
-        f"**Mode**: Dynamic trading enabled\n\n"
-        f"The Leviathan will now use {percentage}% of your wallet for each trade.",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await queue_edit(query,
+        TRIBUTE_UPDATED_TEMPLATE.format(percentage=percentage),
+        reply_markup=BACK_TO_TRADE_SETTINGS_KB,
+        parse_mode='HTML'
     )
 
 async def set_fixed_value(query, amount):
@@ -1703,85 +2330,180 @@ async def set_fixed_value(query, amount):
     TRADE_AMOUNT_USD = amount
     USE_PERCENTAGE_TRADING = False
     
-    keyboard = [
-        [InlineKeyboardButton("🔙 Back to Trade Settings", callback_data="trade_settings")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(
-        f"✅ **Fixed Strike Updated!**\n\n"
-        f"**New Setting**: ${amount} per trade\n"
-        f"**Mode**: Fixed amount trading\n\n"
-        f"The Leviathan will now use exactly ${amount} for each trade.",
-        reply_markup=reply_markup,
-        parse_mode='Markdown'
+    await queue_edit(query,
+        FIXED_STRIKE_UPDATED_TEMPLATE.format(amount=amount),
+        reply_markup=BACK_TO_TRADE_SETTINGS_KB,
+        parse_mode='HTML'
     )
 
 async def remove_specific_channel(query, channel):
     global CHANNELS
     if channel in CHANNELS and len(CHANNELS) > 1:
-        CHANNELS.remove(channel)
-        
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to Sniping Grounds", callback_data="sniping_grounds")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        del CHANNELS[channel]
+        _refresh_channels_cache()
+        _rebuild_main_menu_banner()
         
-        await query.edit_message_text(
-            f"✅ **Channel Removed!**\n\n"
-            f"**Removed**: {channel}\n"
-            f"**Remaining Channels**: {', '.join(CHANNELS)}\n\n"
-            f"The Leviathan will no longer monitor this channel.",
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
+        await queue_edit(query,
+            CHANNEL_REMOVED_TEMPLATE.format(channel=channel, channels=_channels_joined),
+            reply_markup=BACK_TO_SNIPING_GROUNDS_KB,
+            parse_mode='HTML'
         )
     else:
         await query.answer("Cannot remove the last channel!")
 
+# ================== CALLBACK ROUTING ==================
+# Built once after every handler exists; one dict lookup per button tap
+CALLBACK_HANDLERS = {
+    "leviathan_mode": show_leviathan_mode,
+    "back_to_main": show_main_menu,
+
+    # Wallet Dock Actions
+    "view_fleet": view_fleet_action,
+    "remove_wallet": remove_wallet_action,
+    "confirm_remove": confirm_remove_action,
+
+    # Trade Settings Actions
+    "check_settings": check_settings_action,
+
+    # Leviathan Mode Actions
+    "awaken_beast": awaken_beast_action,
+    "sleep_beast": sleep_beast_action,
+    "beast_status": beast_status_action,
+
+    # Sniping Grounds Actions
+    "add_channel": add_channel_action,
+    "view_channels": view_channels_action,
+    "remove_channel": remove_channel_action,
+
+    # Navigation & Logs Actions
+    "war_chest": war_chest_action,
+
+    # Leviathan Forge Actions
+    "adjust_stops": adjust_stops_action,
+    "ladder_strategy": ladder_strategy_action,
+    "reentry_tide": reentry_tide_action,
+}
+
+# Parameterised buttons: prefix -> handler(query, value). One anchored regex
+# picks the prefix, so adding a button type doesn't add a handler to scan
+CALLBACK_PREFIXES = {
+    "set_pct_": set_pct_callback,
+    "set_fixed_": set_fixed_callback,
+    "remove_ch_": remove_specific_channel,
+}
+CALLBACK_PREFIX_RE = re.compile("^(" + "|".join(map(re.escape, CALLBACK_PREFIXES)) + ")(.+)$")
+
+def add_callback_handlers(app):
+    """Register button handlers; PTB matches the patterns in order"""
+    # Pure renders touch no shared state, so they run without blocking the update queue
+    app.add_handler(CallbackQueryHandler(render_menu, pattern=MENUS.__contains__, block=False))
+    app.add_handler(CallbackQueryHandler(handle_callback_query, pattern=CALLBACK_HANDLERS.__contains__))
+    app.add_handler(CallbackQueryHandler(handle_add_wallet_callback, pattern="^add_wallet$"))
+    # Setters mutate state before their first await, so running them concurrently keeps
+    # tap order and lets queue_edit coalesce a burst of taps into one edit
+    app.add_handler(CallbackQueryHandler(handle_prefixed_callback, pattern=CALLBACK_PREFIX_RE, block=False))
+    app.add_handler(CallbackQueryHandler(handle_stale_callback))
+
 async def main():
+    global http_client
+    # Sleep on one event until SIGINT/SIGTERM instead of waking every second
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+    except NotImplementedError:
+        pass  # Windows event loops have no signal handlers; Ctrl+C raises KeyboardInterrupt instead
+
+    http_client = create_http_client()
+
     # Initialize Solana connection
     await init_solana()
-    
-    # Run helius heartbeat alongside the bot
-    hb = asyncio.create_task(helius_heartbeat())
 
-    # Create application with timeout settings
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    # Create application with timeout settings. Bot API calls (replies, menu edits,
+    # alerts) share a pooled, HTTP/2-multiplexed session instead of PTB's single
+    # connection; long polling keeps its own small HTTP/1.1 pool so it never blocks them
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .request(OrjsonHTTPXRequest(
+            connection_pool_size=64,
+            pool_timeout=30.0,
+            http_version="2" if HTTP2_AVAILABLE else "1.1",
+        ))
+        # PTB adds the long-poll timeout to read_timeout, so getUpdates gets 25s + 10s slack
+        .get_updates_request(OrjsonHTTPXRequest(
+            connection_pool_size=2,
+            read_timeout=10.0,
+            write_timeout=15.0,
+            connect_timeout=10.0,
+        ))
+        # Paces sends/edits to Telegram's global and per-chat limits and retries 429s
+        # after retry_after, so a tap-happy user can't get the bot flood-banned
+        .rate_limiter(AIORateLimiter(max_retries=3))
+        .build()
+    )
     app.add_handler(CommandHandler("start", cmd_start))
     app.add_handler(CommandHandler("buy", cmd_buy))
     app.add_handler(CommandHandler("emergency_sell", cmd_emergency_sell))
-    app.add_handler(CallbackQueryHandler(handle_callback_query))
+    add_callback_handlers(app)
     app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_channel_message))
 
     try:
-        print("🔄 Initializing bot...")
-        await app.initialize()
-        print("🔄 Starting bot...")
+        async with asyncio.TaskGroup() as tg:
+            # Background loops live exactly as long as the bot: a crash in one
+            # cancels the rest and propagates, and shutdown cancels them together
+            background = [
+                tg.create_task(helius_heartbeat()),
+                tg.create_task(price_pump()),
+                tg.create_task(warm_up()),
+            ]
+            await run_bot(app, stop)
+            for task in background:
+                task.cancel()
+    finally:
+        await close_http_client()
+
+async def run_bot(app, stop: asyncio.Event):
+    """Start the application and poll until stop is set, then shut it down"""
+    logger.info("🔄 Initializing bot...")
+    await app.initialize()
+    try:
+        logger.info("🔄 Starting bot...")
         await app.start()
-        print("🔄 Starting polling...")
+        logger.info("🔄 Starting polling...")
         await app.updater.start_polling(
-            allowed_updates=Update.ALL_TYPES,
-            timeout=30,
-            read_timeout=30,
-            write_timeout=30,
-            connect_timeout=30
+            # Only what the handlers consume: commands/DMs/groups, channel signals
+            # (edits included, a mint is often edited into a post), buttons
+            allowed_updates=[
+                Update.MESSAGE, Update.EDITED_MESSAGE,
+                Update.CHANNEL_POST, Update.EDITED_CHANNEL_POST,
+                Update.CALLBACK_QUERY,
+            ],
+            timeout=25,
+            poll_interval=0.0
         )
-        print("✅ Bot is running! Press Ctrl+C to stop.")
-        # Keep the bot running
-        while True:
-            await asyncio.sleep(1)
-    except Exception as e:
-        print(f"❌ Bot error: {e}")
+        logger.info("✅ Bot is running! Press Ctrl+C to stop.")
+        await stop.wait()
+        logger.info("🛑 Shutting down...")
     finally:
-        hb.cancel()
         try:
-            await app.stop()
-            await app.shutdown()
-        except:
-            pass
+            # Shielded so a cancel mid-shutdown can't leave the poller or sessions open;
+            # CancelledError is not an Exception, so it still propagates
+            await asyncio.shield(stop_app(app))
+        except Exception as e:
+            logger.warning("⚠️ Shutdown error: %s", e)
+
+async def stop_app(app):
+    """Stop polling and the application, then release its resources"""
+    if app.updater.running:
+        await app.updater.stop()
+    if app.running:
+        await app.stop()
+    await app.shutdown()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        (uvloop.run if uvloop else asyncio.run)(main())
     except KeyboardInterrupt:
         pass
\ No newline at end of file
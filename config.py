@@ -0,0 +1,18 @@
+"""
+Shared configuration
+Reads the .env file once per process; bot.py and test_bot.py both import from here
+"""
+
+import os
+from typing import Optional
+from dotenv import dotenv_values, find_dotenv
+
+# Same file and precedence as load_dotenv(): the first .env found next to or above
+# this module, with real environment variables winning over it
+ENV_FILE = find_dotenv()
+_cfg = {**dotenv_values(ENV_FILE), **os.environ}
+
+def get(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Config value as a string, like os.getenv"""
+    value = _cfg.get(key)
+    return default if value is None else value
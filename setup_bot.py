@@ -6,51 +6,68 @@ This script helps you set up the trading bot with proper configuration
 
 import os
 import sys
+import asyncio
+import importlib.util
+from functools import lru_cache
+
+CONFIG_FILE = "bot_config.env"
+REQUIRED_VARS = (
+    "TELEGRAM_BOT_TOKEN",
+    "RPC_URL",
+    "WALLET_PRIVATE_KEY",
+    "TELEGRAM_CHANNELS"
+)
+# Import names of the packages bot.py cannot start without
+REQUIRED_MODULES = ("telegram", "httpx", "websockets", "nacl", "dotenv", "base58")
 
 def check_dependencies():
     """Check if all required dependencies are installed"""
-    try:
-        import telegram
-        import httpx
-        import websockets
-        import solana
-        import solders
-        print("✅ All dependencies are installed")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
+    # find_spec only locates the package; nothing is imported or initialised
+    missing = [m for m in REQUIRED_MODULES if importlib.util.find_spec(m) is None]
+    if missing:
+        print(f"❌ Missing dependency: {', '.join(missing)}")
         print("Please run: pip install -r requirements.txt")
         return False
+    print("✅ All dependencies are installed")
+    return True
+
+@lru_cache(maxsize=1)
+def parse_config(mtime: float) -> dict:
+    """Required keys from bot_config.env; keyed on mtime so an unchanged file is read once"""
+    found = {}
+    with open(CONFIG_FILE, "r") as f:
+        for line in f:
+            key, sep, value = line.partition("=")
+            key = key.strip()
+            if sep and key in REQUIRED_VARS:
+                found[key] = value.strip()
+                # Stop streaming as soon as every required key has been seen
+                if len(found) == len(REQUIRED_VARS):
+                    break
+    return found
 
 def check_config():
     """Check if configuration file exists and has required values"""
-    if not os.path.exists("bot_config.env"):
-        print("❌ bot_config.env file not found")
+    if not os.path.exists(CONFIG_FILE):
+        print(f"❌ {CONFIG_FILE} file not found")
         return False
     
-    with open("bot_config.env", "r") as f:
-        content = f.read()
-        
-    required_vars = [
-        "TELEGRAM_BOT_TOKEN",
-        "RPC_URL", 
-        "WALLET_PRIVATE_KEY",
-        "TELEGRAM_CHANNELS"
-    ]
-    
-    missing_vars = []
-    for var in required_vars:
-        if f"{var}=" not in content or f"{var}=your_" in content:
-            missing_vars.append(var)
+    parsed = parse_config(os.path.getmtime(CONFIG_FILE))
+    missing_vars = [var for var in REQUIRED_VARS
+                    if not parsed.get(var) or parsed[var].startswith("your_")]
     
     if missing_vars:
         print(f"❌ Missing or incomplete configuration: {', '.join(missing_vars)}")
-        print("Please update bot_config.env with your actual values")
+        print(f"Please update {CONFIG_FILE} with your actual values")
         return False
     
     print("✅ Configuration file looks good")
     return True
 
+async def check_config_async():
+    """check_config() for async callers; the file read runs in the default executor"""
+    return await asyncio.get_running_loop().run_in_executor(None, check_config)
+
 def main():
     print("🤖 Trading Bot Setup Check")
     print("=" * 40)
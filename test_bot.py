@@ -5,105 +5,127 @@ Test the bot configuration and basic functionality
 """
 
 import asyncio
-import os
-from dotenv import load_dotenv
+import importlib.util
+import httpx
+import config
 
-# Load configuration
-load_dotenv("bot_config.env")
+# One pooled client for every HTTP probe, closed at the end of main()
+_HTTP = httpx.AsyncClient(
+    timeout=10.0,
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+)
 
-async def test_config():
+# solana-py client, created on first use so a missing package only fails its own probe
+_SOLANA = None
+
+async def get_solana():
+    global _SOLANA
+    if _SOLANA is None:
+        from solana.rpc.async_api import AsyncClient
+        _SOLANA = AsyncClient(config.get("RPC_URL"), timeout=15)
+    return _SOLANA
+
+async def test_config(log=print):
     """Test bot configuration"""
-    print("🧪 Testing Bot Configuration")
-    print("=" * 40)
+    log("🧪 Testing Bot Configuration")
+    log("=" * 40)
+    
+    # config merges the .env file and environment once; every lookup is a dict read
+    channels = config.get("TELEGRAM_CHANNELS", "")
     
     # Check required environment variables
     required_vars = {
-        "TELEGRAM_BOT_TOKEN": os.getenv("TELEGRAM_BOT_TOKEN"),
-        "RPC_URL": os.getenv("RPC_URL"),
-        "WALLET_PRIVATE_KEY": os.getenv("WALLET_PRIVATE_KEY"),
-        "TELEGRAM_CHANNELS": os.getenv("TELEGRAM_CHANNELS")
+        "TELEGRAM_BOT_TOKEN": config.get("TELEGRAM_BOT_TOKEN"),
+        "RPC_URL": config.get("RPC_URL"),
+        "WALLET_PRIVATE_KEY": config.get("WALLET_PRIVATE_KEY"),
+        "TELEGRAM_CHANNELS": channels
     }
     
     for var, value in required_vars.items():
         if value and value != "your_wallet_private_key_here":
-            print(f"✅ {var}: {'*' * 10}...{value[-4:]}")
+            log(f"✅ {var}: {'*' * 10}...{value[-4:]}")
         else:
-            print(f"❌ {var}: Not configured")
+            log(f"❌ {var}: Not configured")
     
-    print(f"\n📊 Trading Configuration:")
-    print(f"   Trade Amount: ${os.getenv('TRADE_AMOUNT_USD', '10')}")
-    print(f"   Stop Loss: {os.getenv('STOP_LOSS_PCT', '-30')}%")
-    print(f"   Trail Stop: {os.getenv('TRAIL_FROM_PEAK_PCT', '15')}%")
-    print(f"   Dry Run: {os.getenv('DRY_RUN', 'true')}")
+    log(f"\n📊 Trading Configuration:")
+    log(f"   Trade Amount: ${config.get('TRADE_AMOUNT_USD', '10')}")
+    log(f"   Stop Loss: {config.get('STOP_LOSS_PCT', '-30')}%")
+    log(f"   Trail Stop: {config.get('TRAIL_FROM_PEAK_PCT', '15')}%")
+    log(f"   Dry Run: {config.get('DRY_RUN', 'true')}")
     
-    print(f"\n📡 Channels to Monitor:")
-    channels = os.getenv("TELEGRAM_CHANNELS", "").split(",")
-    for channel in channels:
+    log(f"\n📡 Channels to Monitor:")
+    for channel in channels.split(","):
         if channel.strip():
-            print(f"   - {channel.strip()}")
+            log(f"   - {channel.strip()}")
 
-async def test_jupiter_connection():
+async def test_jupiter_connection(log=print):
     """Test Jupiter API connection"""
-    print("\n🌐 Testing Jupiter API Connection")
-    print("=" * 40)
+    log("\n🌐 Testing Jupiter API Connection")
+    log("=" * 40)
     
     try:
-        import httpx
-        
         # Test Jupiter price API
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get("https://price.jup.ag/v6/price", 
-                                     params={"ids": "So11111111111111111111111111111111111111112", 
+        response = await _HTTP.get("https://price.jup.ag/v6/price", 
+                                   params={"ids": "So11111111111111111111111111111111111111112", 
                                            "vsToken": "So11111111111111111111111111111111111111112"})
+        
+        if response.status_code == 200:
+            log("✅ Jupiter Price API: Connected")
+        else:
+            log(f"❌ Jupiter Price API: Error {response.status_code}")
             
-            if response.status_code == 200:
-                print("✅ Jupiter Price API: Connected")
-            else:
-                print(f"❌ Jupiter Price API: Error {response.status_code}")
-                
     except Exception as e:
-        print(f"❌ Jupiter API Error: {e}")
+        log(f"❌ Jupiter API Error: {e}")
 
-async def test_solana_connection():
+async def test_solana_connection(log=print):
     """Test Solana RPC connection"""
-    print("\n⛓️ Testing Solana RPC Connection")
-    print("=" * 40)
+    log("\n⛓️ Testing Solana RPC Connection")
+    log("=" * 40)
     
     try:
-        from solana.rpc.async_api import AsyncClient
-        
-        rpc_url = os.getenv("RPC_URL")
-        if not rpc_url:
-            print("❌ RPC_URL not configured")
+        if not config.get("RPC_URL"):
+            log("❌ RPC_URL not configured")
             return
             
-        client = AsyncClient(rpc_url)
+        client = await get_solana()
         
         # Test connection
         version = await client.get_version()
         if version:
-            print("✅ Solana RPC: Connected")
-            print(f"   Version: {version.value.get('solana-core', 'Unknown')}")
+            log("✅ Solana RPC: Connected")
+            log(f"   Version: {version.value.get('solana-core', 'Unknown')}")
         else:
-            print("❌ Solana RPC: Connection failed")
-            
-        await client.close()
+            log("❌ Solana RPC: Connection failed")
         
     except Exception as e:
-        print(f"❌ Solana RPC Error: {e}")
+        log(f"❌ Solana RPC Error: {e}")
 
 async def main():
     print("🤖 Bot Test Suite")
     print("=" * 50)
     
-    await test_config()
-    await test_jupiter_connection()
-    await test_solana_connection()
+    # The probes are independent, so run them together; each buffers its
+    # lines and the reports are printed in order once all have finished
+    reports = ([], [], [])
+    try:
+        await asyncio.gather(
+            test_config(reports[0].append),
+            test_jupiter_connection(reports[1].append),
+            test_solana_connection(reports[2].append)
+        )
+    finally:
+        await _HTTP.aclose()
+        if _SOLANA is not None:
+            await _SOLANA.close()
+    for lines in reports:
+        for line in lines:
+            print(line)
     
     print("\n" + "=" * 50)
     print("✅ Test completed!")
     print("\nNext steps:")
-    print("1. Update WALLET_PRIVATE_KEY in bot_config.env")
+    print("1. Update WALLET_PRIVATE_KEY in .env")
     print("2. Run: python bot.py")
     print("3. Test with /start command in Telegram")
 